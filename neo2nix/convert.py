@@ -0,0 +1,206 @@
+"""
+Batch conversion of recordings from formats supported by Neo into NIX.
+
+Every source file is read with the Neo IO matching its extension and
+written to <output>/<path>.h5 by a process pool, where <path> is the path
+of the source below the root folder (by default the common folder of all
+sources). Files that were already converted are skipped, so an interrupted
+batch can be resumed. Give the root explicitly when resuming with a different
+selection of sources, so that their paths do not change.
+
+    python -m neo2nix.convert -o /data/nix -j 8 --root /data/raw /data/raw/*/*.plx
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from neo2nix.nixio import NixIO, child_attrs
+
+
+def get_io_class(filename):
+    """ Finds the Neo IO class to read a file by its extension """
+    import neo.io
+
+    ext = os.path.splitext(filename)[1][1:].lower()
+    for io_class in neo.io.iolist:
+        if ext in [x.lower() for x in io_class.extensions]:
+            return io_class
+
+    raise ValueError("no Neo IO can read %s" % filename)
+
+
+def get_destination(filename, out_dir, root):
+    """ Path of the NIX file, mirroring the path of the source below root """
+    name = os.path.splitext(os.path.relpath(os.path.abspath(filename), root))[0]
+    return os.path.join(out_dir, name + '.h5')
+
+
+def get_destinations(sources, out_dir, root=None):
+    """
+    Paths of the NIX files of sources, below out_dir as the sources are below
+    root.
+
+    :param root:        folder of the sources, by default their common folder
+    :raises ValueError: if a source is not below root, or if two sources
+                        would be written to the same file
+    """
+    if not sources:
+        return []
+
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(x)) for x in sources])
+    root = os.path.abspath(root)
+
+    for source in sources:
+        if not os.path.abspath(source).startswith(os.path.join(root, '')):
+            raise ValueError("%s is not below %s" % (source, root))
+
+    destinations = [get_destination(x, out_dir, root) for x in sources]
+
+    seen = {}
+    for source, destination in zip(sources, destinations):
+        if destination in seen:
+            raise ValueError("%s and %s would both be converted to %s" % (seen[destination], source, destination))
+        seen[destination] = source
+
+    return destinations
+
+
+def fill_names(neo_obj, default):
+    """ NIX requires names for all containers, Neo does not """
+    if neo_obj.name is None:
+        neo_obj.name = default
+
+    obj_type = neo_obj.__class__.__name__.lower()
+    for attr_name in child_attrs.get(obj_type, ()):
+        for i, child in enumerate(getattr(neo_obj, attr_name)):
+            if child.__class__.__name__.lower() in child_attrs:
+                fill_names(child, '%s %d' % (attr_name[:-1], i))
+
+
+def convert_file(args):
+    """
+    Converts a single file. Runs in a worker process.
+
+    :param args:    tuple (source path, destination path, writer options)
+    :return:        tuple (source, destination, source size in bytes,
+                    seconds spent, error message or None)
+    """
+    source, destination, options = args
+    started = time.time()
+    size = 0
+
+    tmp = destination + '.part'
+    try:
+        size = os.path.getsize(source)
+        reader = get_io_class(source)(filename=source)
+        if hasattr(reader, 'read_all_blocks'):
+            blocks = reader.read_all_blocks()
+        else:
+            blocks = [reader.read_block()]
+
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        io = NixIO(tmp)
+        for i, block in enumerate(blocks):
+            fill_names(block, '%s %d' % (os.path.basename(source), i))
+            io.write_block(block, **options)
+
+        os.replace(tmp, destination)  # complete files only, for resuming
+        error = None
+
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        error = '%s: %s' % (e.__class__.__name__, e)
+
+    return source, destination, size, time.time() - started, error
+
+
+def print_progress(done, total, result, files_per_s, mb_per_s):
+    source, destination, size, seconds, error = result
+    status = 'FAILED ' + error if error else '%.1fs' % seconds
+
+    line = '[%d/%d] %s %s (%.2f files/s, %.1f MB/s)'
+    sys.stderr.write(line % (done, total, source, status, files_per_s, mb_per_s) + '\n')
+
+
+def convert(sources, out_dir, processes=None, resume=True, report=print_progress, root=None, **options):
+    """
+    Converts files to NIX in parallel.
+
+    :param sources:     paths of the files to convert
+    :param out_dir:     folder for the NIX files
+    :param processes:   number of worker processes (default: number of CPUs)
+    :param resume:      skip files whose NIX file already exists
+    :param report:      called after every file with (files done, files
+                        total, result (see convert_file), files/s, MB/s)
+    :param root:        folder of the sources, see get_destinations
+    :param options:     NixIO.write_block options, like storage_dtype
+    :return:            list of results, see convert_file
+    """
+    tasks = [(x, y, options) for x, y in zip(sources, get_destinations(sources, out_dir, root))]
+    if resume:
+        tasks = [x for x in tasks if not os.path.exists(x[1])]
+
+    for folder in set([os.path.dirname(x[1]) for x in tasks] + [out_dir]):
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+    results = []
+    started = time.time()
+    total_size = 0
+
+    pool = Pool(processes)
+    try:
+        for result in pool.imap_unordered(convert_file, tasks):
+            results.append(result)
+            total_size += result[2]
+
+            elapsed = max(time.time() - started, 1e-9)
+            if report is not None:
+                report(len(results), len(tasks), result, len(results) / elapsed, total_size / elapsed / 2 ** 20)
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert Neo-readable files to NIX')
+    parser.add_argument('sources', nargs='+', help='files to convert')
+    parser.add_argument('-o', '--output', required=True, help='folder for the NIX files')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--no-resume', action='store_true', help='convert files that exist already')
+    parser.add_argument('--root', help='folder of the sources (default: their common folder)')
+    parser.add_argument('--storage-dtype', help='store signals as this dtype, like float32 or int16')
+    parser.add_argument('--summary-chunk', type=int, help='store signal summaries per this many samples')
+    parser.add_argument('--pyramid', help='decimation factors, like 10,100,1000')
+    parser.add_argument('--compact', action='store_true', help='store metadata as a record per object')
+    parser.add_argument('--shared', action='store_true', help='store equal data once per file')
+    parser.add_argument('--times-array', action='store_true', help='store times of irregular signals separately')
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.storage_dtype:
+        options['storage_dtype'] = args.storage_dtype
+    if args.summary_chunk:
+        options['summary_chunk'] = args.summary_chunk
+    if args.pyramid:
+        options['pyramid'] = [int(x) for x in args.pyramid.split(',')]
+    for name in ('compact', 'shared', 'times_array'):
+        if getattr(args, name):
+            options[name] = True
+
+    results = convert(args.sources, args.output, args.jobs, not args.no_resume, root=args.root, **options)
+
+    failed = [x for x in results if x[4]]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+A view of many NIX files (like all sessions of a study) as one dataset.
+
+    ds = Dataset('/data/study/*.h5', processes=8)
+    segments = ds.load(ds.find(type='segment', where={'name': 'trial 1'}))
+
+Files are indexed in parallel from metadata only (see Reader.read_index),
+and objects found in the catalog are read by worker processes.
+"""
+import glob
+from collections import OrderedDict
+from multiprocessing import Pool
+
+from neo2nix.nixio import NixIO, Reader, ProxyList, child_attrs
+
+
+def index_file(filename):
+    """ Index entries of a file (see NixIO.build_index). Runs in a worker process. """
+    return NixIO(filename, readonly=True).build_index()
+
+
+def detach(neo_obj):
+    """
+    Replaces lazy loaded children collections of an object by plain lists,
+    recursively, so that it can be used without the file (and pickled).
+    """
+    for attr_name in child_attrs.get(neo_obj.__class__.__name__.lower(), ()):
+        children = getattr(neo_obj, attr_name)
+        if isinstance(children, ProxyList):
+            children = list(children)
+            setattr(neo_obj, attr_name, children)
+
+        for child in children:
+            detach(child)
+
+    return neo_obj
+
+
+def load_entries(args):
+    """
+    Reads objects of a single file with all their children. Runs in a
+    worker process.
+
+    :param args:    tuple (filename, index entries, read options)
+    :return:        list of objects, in the order of the entries
+    """
+    filename, entries, options = args
+    io = NixIO(filename, readonly=True)
+
+    with io.session():
+        objects = [io.read_object(x['block'], x['type'], x['nix_name'], x['parent'], **options) for x in entries]
+        return [detach(x) for x in objects]
+
+
+class Dataset(object):
+    """ A catalog of objects across many NIX files written by NixIO """
+
+    def __init__(self, files, processes=None):
+        """
+        :param files:       list of paths or a glob pattern
+        :param processes:   number of worker processes, by default one per CPU
+        """
+        if isinstance(files, str):
+            files = sorted(glob.glob(files))
+
+        self.files = list(files)
+        self.processes = processes
+        self.catalog = self._build_catalog()
+
+    def _map(self, func, items):
+        if len(items) < 2 or self.processes == 1:
+            return [func(x) for x in items]
+
+        pool = Pool(self.processes)
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _build_catalog(self):
+        catalog = []
+        for filename, entries in zip(self.files, self._map(index_file, self.files)):
+            catalog += [dict(x, file=filename) for x in entries]
+
+        return catalog
+
+    def find(self, type=None, where=None, block=None, files=None):
+        """
+        Finds catalog entries by type, name and attributes / annotations,
+        see NixIO.find.
+
+        :param files:   paths of the files to search in
+        :return:        list of index entries with a 'file' key
+        """
+        def matches(entry):
+            if type is not None and not entry['type'] == type:
+                return False
+            if block is not None and not entry['block'] == block:
+                return False
+            if files is not None and entry['file'] not in files:
+                return False
+
+            values = dict(entry['attributes'], **entry['annotations'])
+            values.setdefault('name', entry['name'])
+
+            return Reader.Help.match(values, where)
+
+        return [x for x in self.catalog if matches(x)]
+
+    def load(self, entries, **options):
+        """
+        Reads the objects of catalog entries with all their children, one
+        worker process per file.
+
+        :param options: read options, see NixIO.read_block
+        :return:        list of objects, in the order of the entries
+        """
+        by_file = OrderedDict()
+        for i, entry in enumerate(entries):
+            by_file.setdefault(entry['file'], []).append((i, entry))
+
+        tasks = [(f, [x for i, x in items], options) for f, items in by_file.items()]
+        results = self._map(load_entries, tasks)
+
+        objects = [None] * len(entries)
+        for items, loaded in zip(by_file.values(), results):
+            for (i, entry), obj in zip(items, loaded):
+                objects[i] = obj
+
+        return objects
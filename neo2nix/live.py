@@ -0,0 +1,131 @@
+import time
+
+from neo2nix.nixio import FileHandler, Reader, Writer
+
+
+def retry(func, timeout, delay):
+    """
+    Calls func until it succeeds or timeout seconds have passed. Used to open
+    a file which may be open in another process for a moment (HDF5 locks
+    files).
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return func()
+        except Exception:  # error types differ between NIX backends
+            if time.time() >= deadline:
+                raise
+            time.sleep(delay)
+
+
+class LiveWriter(object):
+    """
+    Appends samples to AnalogSignals and spike times to SpikeTrains of a file
+    (see Writer.append_data) while other processes read it with LiveReader.
+
+    NIX cannot open HDF5 files in single-writer / multiple-reader (SWMR)
+    mode, so the file is not kept open: appended data are buffered and
+    written every flush_interval seconds, with the file open only for the
+    time of writing. Readers see a consistent file with all data written
+    so far.
+
+    Signals and SpikeTrains to append to must be in the file already, e.g.
+    written by NixIO.write_block with the first samples. They are addressed
+    by the names they were written with; in the file they get their live
+    names (see live_array_name) on the first append.
+    """
+
+    def __init__(self, filename, flush_interval=1.0, timeout=30.0, retry_delay=0.01):
+        """
+        :param flush_interval:  seconds between writes to the file
+        :param timeout:         seconds to keep trying to open the file if
+                                it is locked by readers
+        :param retry_delay:     seconds between these attempts
+        """
+        self.f = FileHandler(filename)
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self._buffer = []  # (block_id, array_id, data)
+        self._last_flush = time.time()
+
+    def append(self, block_id, array_id, data):
+        """ Appends data to an array, writing all buffered data if it is time """
+        self._buffer.append((block_id, array_id, data))
+
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered data to the file. Data which cannot be appended
+        (e.g. to an array not in the file) are dropped; a ValueError naming
+        them is raised after the rest is written.
+        """
+        failed = []
+
+        if self._buffer:
+            retry(self.f.open, self.timeout, self.retry_delay)
+
+            try:
+                while self._buffer:
+                    block_id, array_id, data = self._buffer.pop(0)
+                    try:
+                        Writer.append_data(self.f.handle, block_id, array_id, data)
+                    except Exception as e:
+                        failed.append("%s/%s (%s)" % (block_id, array_id, e))
+            finally:
+                self.f.close()
+
+        self._last_flush = time.time()
+
+        if failed:
+            raise ValueError("data were dropped, cannot append to " + ", ".join(failed))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class LiveReader(object):
+    """
+    Reads data of a file while a LiveWriter appends to it. The file is
+    opened for every read, so every read sees the current extent of the
+    data arrays.
+    """
+
+    def __init__(self, filename, timeout=30.0, retry_delay=0.01):
+        self.f = FileHandler(filename, readonly=True)
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self._positions = {}  # (block_id, array_id): number of samples read
+
+    def _read(self, read_func, *args):
+        retry(self.f.open, self.timeout, self.retry_delay)
+
+        try:
+            return read_func(self.f, *args)
+        finally:
+            self.f.close()
+
+    def read_tail(self, block_id, array_id):
+        """
+        Samples of an AnalogSignal (or spike times of a SpikeTrain) appended
+        since the previous call for this array, as a Quantity array. The
+        first call returns all samples.
+        """
+        start = self._positions.get((block_id, array_id), 0)
+        data, n = self._read(Reader.read_samples, block_id, array_id, start)
+
+        self._positions[(block_id, array_id)] = start + len(data)
+        return data
+
+    def read_last(self, block_id, array_id, duration):
+        """ The newest duration of an AnalogSignal as an AnalogSignal """
+        return self._read(Reader.read_analogsignal_tail, block_id, array_id, duration)
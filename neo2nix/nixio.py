@@ -1,12 +1,40 @@
-from neo.core import objectlist
-from neo.core import Block, Event, Epoch, Segment, AnalogSignal, \
-    IrregularlySampledSignal, SpikeTrain, RecordingChannelGroup, Unit
-from neo.io.baseio import BaseIO
-
-import numpy as np
-import quantities as pq
-import nix
 import os
+import json
+import hashlib
+import threading
+import warnings
+import datetime
+import functools
+import contextlib
+import importlib
+
+
+# -------------------------------------------
+# lazy dependencies
+# -------------------------------------------
+
+
+class LazyModule(object):
+    """
+    A module which is imported on first attribute access. Keeps importing
+    this module cheap for tools that do not need Neo, NIX or numpy at all.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attr)
+
+
+neo = LazyModule('neo.core')
+np = LazyModule('numpy')
+pq = LazyModule('quantities')
+nix = LazyModule('nix')
 
 
 # -------------------------------------------
@@ -24,12 +52,14 @@ def file_transaction(method):
     """
     def wrapped(*args, **kwargs):
         instance = args[0]
-        instance.f.open()
 
-        result = method(*args, **kwargs)
-        
-        instance.f.close()
-        return result
+        with instance.f.lock:
+            instance.f.open()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                instance.f.close()
 
     return wrapped
 
@@ -37,30 +67,86 @@ def file_transaction(method):
 class FileHandler(object):
     """
     Wrapper for NIX.File to provide some extended functions
+
+    Opening is re-entrant: nested open() calls share the file, which is
+    closed (and so flushed) by the outermost close() only. All threads share
+    the file handle; I/O is serialized by the lock.
     """
 
-    def __init__(self, filename, readonly=False):
+    def __init__(self, filename, readonly=False, read_window=None):
+        """
+        :param read_window:     bytes of data to read at once when streaming
+                                data arrays (see chunk_len); this is not the
+                                HDF5 chunk cache, which NIX does not expose
+        """
         self.filename = filename
         self.readonly = readonly
+        self.read_window = read_window
         self.handle = None  # future NIX file handle
+        self.lock = threading.RLock()
+        self._depth = 0  # number of open() calls not closed yet
 
     def open(self):
-        if os.path.exists(self.filename):
-            if self.readonly:
-                filemode = nix.FileMode.ReadOnly
+        with self.lock:
+            self._depth += 1
+            if self._depth > 1:
+                return
+
+            if os.path.exists(self.filename):
+                if self.readonly:
+                    filemode = nix.FileMode.ReadOnly
+                else:
+                    filemode = nix.FileMode.ReadWrite
+            elif self.readonly:
+                self._depth = 0
+                raise IOError("%s does not exist" % self.filename)
             else:
-                filemode = nix.FileMode.ReadWrite
-        else:
-            filemode = nix.FileMode.Overwrite
+                filemode = nix.FileMode.Overwrite
 
-        self.handle = nix.File.open(self.filename, filemode)
+            try:
+                self.handle = nix.File.open(self.filename, filemode)
+            except Exception:
+                self._depth = 0
+                raise
 
     def close(self):
-        self.handle.close()
+        with self.lock:
+            self._depth = max(self._depth - 1, 0)
+            if self._depth == 0:
+                self.handle.close()
+
+    @property
+    def is_open(self):
+        return self._depth > 0
+
+    def flush(self):
+        """
+        Writes buffered changes to disk without closing the file, with
+        nix.File.flush. Warns if the NIX version has none: changes are then
+        written on close.
+        """
+        with self.lock:
+            if hasattr(self.handle, 'flush'):
+                self.handle.flush()
+            else:
+                warnings.warn("NIX backend cannot flush, changes are written on close", RuntimeWarning)
+
+    def chunk_len(self, nix_da):
+        """ Number of rows of a data array to read at once when streaming """
+        if self.read_window is None:
+            return read_chunk_len
+
+        shape = nix_da.data_extent
+        row_size = nix_da.dtype.itemsize * int(np.prod(shape[1:]))
+
+        return max(self.read_window // row_size, 1)
 
 
 class ProxyList(object):
-    """ An enhanced list that can load its members on demand. """
+    """
+    An enhanced list that can load its members on demand. Members are
+    fetched once, also if several threads access the list at the same time.
+    """
 
     def __init__(self, fh, fetch_func):
         """
@@ -70,22 +156,64 @@ class ProxyList(object):
         self._fh = fh
         self._fetch_func = fetch_func
         self._cache = None
+        self._loaded = None  # members as fetched, to detect changes
+        self._lock = fh.lock if fh is not None else threading.RLock()
 
     @property
     def _data(self):
         if self._cache is None:
-            should_close = False
+            with self._lock:
+                if self._cache is None:
+                    self._fh.open()
+                    try:
+                        cache = self._fetch_func(self._fh.handle)
+                    finally:
+                        self._fh.close()
+
+                    self._loaded = list(cache)
+                    self._cache = cache
+
+        return self._cache
 
-            if self._fh.handle is None or not self._fh.handle.is_open():
-                self._fh.open()
-                should_close = True
+    @property
+    def is_loaded(self):
+        return self._cache is not None
 
-            self._cache = self._fetch_func(self._fh.handle)
+    def is_modified(self):
+        """ True if members were added, removed or reordered since loading """
+        if self._cache is None:
+            return False
+        return [id(x) for x in self._cache] != [id(x) for x in self._loaded]
 
-            if should_close:
-                self._fh.close()
+    def set_saved(self):
+        """ Marks the current members as the ones in the file, after writing """
+        with self._lock:
+            if self._cache is not None:
+                self._loaded = list(self._cache)
 
-        return self._cache
+    def check_evict(self):
+        """
+        Raises ValueError if evicting would lose changes: added, removed or
+        reordered members, or members (or their loaded children) changed
+        since loading, see Writer.Help.is_clean.
+        """
+        if self.is_modified():
+            raise ValueError("list was modified since loading, write it before evicting")
+
+        if self._cache is not None and not all([Writer.Help.is_clean(x) for x in self._cache]):
+            raise ValueError("members were changed since loading, write them before evicting")
+
+    def evict(self):
+        """
+        Drops the loaded members, so that they are fetched again on next
+        access. Lists with unsaved changes cannot be evicted (see
+        check_evict).
+        """
+        with self._lock:
+            self.check_evict()
+
+            self._cache = None
+            self._loaded = None
 
     def __getitem__(self, index):
         return self._data.__getitem__(index)
@@ -121,6 +249,57 @@ class ProxyList(object):
         return '<' + self.__class__.__name__ + '>' + self._data.__repr__()
 
 
+class Handle(object):
+    """
+    A reference to an object in a file, as found by NixIO.find. The object
+    itself is read only on load().
+    """
+
+    def __init__(self, io, entry):
+        """
+        :param io:      NixIO instance of the file
+        :param entry:   index entry (see Reader.read_index)
+        """
+        self._io = io
+        self.block = entry['block']
+        self.type = entry['type']
+        self.nix_name = entry['nix_name']
+        self.name = entry['name']
+        self.parent = entry['parent']
+        self.annotations = entry['annotations']
+
+    def load(self, **options):
+        return self._io.read_object(self.block, self.type, self.nix_name, self.parent, **options)
+
+    def __repr__(self):
+        return '<%s %s %s>' % (self.__class__.__name__, self.type, self.name)
+
+
+class StoredArray(object):
+    """
+    A data array of a Block whose data are kept in the file-level store (see
+    Writer.Help.store_data). Data are read from the stored array, everything
+    else (metadata, dimensions, sources) from the array in the Block.
+    """
+
+    data_attrs = ('data_extent', 'dtype', 'polynom_coefficients')
+
+    def __init__(self, nix_da, nix_stored):
+        self._nix_da = nix_da
+        self._nix_stored = nix_stored
+
+    def __getattr__(self, attr):
+        if attr in self.data_attrs:
+            return getattr(self._nix_stored, attr)
+        return getattr(self._nix_da, attr)
+
+    def __getitem__(self, index):
+        return self._nix_stored[index]
+
+    def __len__(self):
+        return self.data_extent[0]
+
+
 # -------------------------------------------
 # Reader / Writer
 # -------------------------------------------
@@ -138,6 +317,56 @@ simple_attrs = {
     'unit': ()
 }
 
+data_attrs = {  # values stored with the data array, besides simple_attrs
+    'analogsignal': ('units', 'sampling_rate', 't_start'),
+    'irregularlysampledsignal': ('units', 'times'),
+    'spiketrain': ('units', 'sampling_rate', 't_start', 't_stop', 'left_sweep'),
+    'event': ('labels',),
+    'epoch': ('labels', 'durations'),
+}
+
+child_attrs = {
+    'block': ('segments', 'recordingchannelgroups'),
+    'segment': ('analogsignals', 'irregularlysampledsignals', 'spiketrains', 'events', 'epochs'),
+    'recordingchannelgroup': ('units', 'analogsignals', 'irregularlysampledsignals'),
+    'unit': ('spiketrains',),
+}
+
+summary_stats = ('min', 'max', 'mean', 'rms')
+
+read_chunk_len = 2 ** 18  # samples per read when streaming data arrays
+
+side_array_types = ('analogsignal_summary', 'analogsignal_pyramid', 'irregularlysampledsignal_times')
+
+record_prop = 'neo_record'  # property with all metadata of an object (compact layout)
+
+index_section = 'neo2nix_index'  # root section with a saved index, see Reader.read_index
+
+store_block = 'neo2nix_store'  # block (and its root section) with shared data, see Writer.Help.store_data
+
+store_prefix = 'neo2nix_store:'  # definition of arrays whose data are in the store
+
+
+def live_array_name(obj_name):
+    """
+    Name of the data array of a signal or SpikeTrain appended to (see
+    Writer.append_data). Unlike content hash names, it stays valid while
+    the array grows.
+    """
+    return obj_name + '.live'
+
+
+def side_array_name(obj_name, kind):
+    """
+    Name of an auxiliary data array stored next to the array of a Neo object
+    (like per-chunk summaries of an AnalogSignal).
+
+    :param obj_name:    name of the main NIX data array
+    :param kind:        kind of the side array, like 'summary'
+    :return:            name of the side data array
+    """
+    return obj_name + '__' + kind
+
 
 class Reader:
     """
@@ -154,11 +383,50 @@ class Reader:
         def get_obj_neo_name(nix_obj):
             if nix_obj.type in ['analogsignal', 'spiketrain', 'event', 'epoch']:
                 try:
-                    return nix_obj.metadata['name']
+                    return Reader.Help.get_metadata(nix_obj.metadata)['name']
                 except KeyError:
                     return None
             return nix_obj.name
 
+        @staticmethod
+        def decode_value(obj):  # object_hook for json
+            if '__quantity__' in obj:
+                return pq.Quantity(*obj['__quantity__'])
+            if '__datetime__' in obj:
+                return datetime.datetime.strptime(obj['__datetime__'], '%Y-%m-%dT%H:%M:%S.%f')
+            return obj
+
+        @staticmethod
+        def get_metadata(nix_section):
+            """
+            Metadata of an object: a dict decoded from the compact record (see
+            Writer.Help.write_record) or the section itself for the layout with
+            a property per value. Both are read the same way by read_attributes,
+            read_annotations and read_quantity.
+            """
+            try:
+                return json.loads(nix_section[record_prop], object_hook=Reader.Help.decode_value)
+            except KeyError:
+                return nix_section
+
+        @staticmethod
+        def match(values, where):
+            """
+            Checks values (attributes and annotations of an object) against a
+            dict {key: value or function returning True for matching values}.
+            """
+            for key, expected in (where or {}).items():
+                if key not in values:
+                    return False
+
+                if callable(expected):
+                    if not expected(values[key]):
+                        return False
+                elif not values[key] == expected:
+                    return False
+
+            return True
+
         @staticmethod
         def read_attributes(nix_section, obj_type):
             result = {}
@@ -173,9 +441,13 @@ class Reader:
         def read_annotations(nix_section, obj_type):
             result = {}
 
+            if isinstance(nix_section, dict):
+                keys = list(nix_section.keys())
+            else:
+                keys = [prop.name for prop in nix_section.props]
+
             exclude_attrs = simple_attrs['default'] + simple_attrs[obj_type]
-            for prop in nix_section.props:
-                key = prop.name
+            for key in keys:
                 value = nix_section[key]
 
                 if key not in exclude_attrs:
@@ -198,50 +470,324 @@ class Reader:
         @staticmethod
         def read_quantity(nix_section, qname):
             value = nix_section[qname]
+            if isinstance(value, pq.Quantity):
+                return value  # compact record
+
             unit = nix_section[qname + '__unit']
             return pq.quantity.Quantity(float(value), unit)
 
+        @staticmethod
+        def load(neo_obj, recursive=False):
+            """ Fetches all lazy loaded children collections of an object """
+            for attr_name in child_attrs.get(neo_obj.__class__.__name__.lower(), ()):
+                children = getattr(neo_obj, attr_name)
+                len(children)
+
+                if recursive:
+                    for child in children:
+                        Reader.Help.load(child, recursive)
+
+            return neo_obj
+
+        @staticmethod
+        def release(neo_obj):
+            """
+            Evicts all loaded children collections of an object, recursively.
+            The whole subtree is checked first, so that nothing is released
+            if any part of it has unsaved changes (see ProxyList.check_evict).
+            """
+            attr_names = child_attrs.get(neo_obj.__class__.__name__.lower(), ())
+            lists = [getattr(neo_obj, x) for x in attr_names]
+            lists = [x for x in lists if isinstance(x, ProxyList) and x.is_loaded]
+
+            for children in lists:
+                children.check_evict()
+
+            for children in lists:
+                for child in children:
+                    Reader.Help.release(child)
+                children.evict()
+
+            return neo_obj
+
+        @staticmethod
+        def share(neo_obj, manager):
+            """ Moves the data of an object to shared memory, see neo2nix.sharedmem """
+            from neo2nix import sharedmem
+
+            return sharedmem.share(neo_obj, manager)
+
+        @staticmethod
+        def set_state(neo_obj, nix_block, nix_name, derived=False, nix_names=None):
+            """
+            Marks an object as clean, i.e. as equal to nix_name in a Block of
+            a file, after reading or writing it. Its children collections are
+            marked as saved (see Writer.Help.is_clean_list).
+
+            Derived objects (reduced or partial reads) are not equal to it and
+            cannot be written back, see Writer.Help.check_derived.
+
+            :param nix_names:   cache of data object names, see
+                                Writer.Help.get_nix_name
+            """
+            state = Writer.Help.get_state(neo_obj, nix_block, nix_name, nix_names)
+            if derived:
+                state['derived'] = True
+
+            children = {}
+            for attr_name in child_attrs.get(Writer.Help.get_classname(neo_obj), ()):
+                neo_objs = getattr(neo_obj, attr_name)
+
+                if isinstance(neo_objs, ProxyList):
+                    neo_objs.set_saved()
+                else:
+                    children[attr_name] = [id(x) for x in neo_objs]
+
+            state['children'] = children
+            neo_obj._nix_state = state
+
+        @staticmethod
+        def get_pyramid_level(nix_block, array_id, max_points):
+            """
+            Finds the finest decimation level of a signal (see
+            Writer.Help.write_pyramid) with no more than max_points samples,
+            or the coarsest level if none is small enough.
+
+            :return:    (factor, nix data array) or None if no levels stored
+            """
+            prefix = side_array_name(array_id, 'pyramid')
+            levels = [x for x in nix_block.data_arrays if x.type == 'analogsignal_pyramid']
+            levels = [(int(x.name[len(prefix):]), x) for x in levels if x.name.startswith(prefix)]
+            if not levels:
+                return None
+
+            levels.sort(key=lambda x: x[0])
+            fitting = [x for x in levels if 2 * x[1].data_extent[0] <= max_points]
+
+            return fitting[0] if fitting else levels[-1]
+
+        @staticmethod
+        def get_data_array(nix_file, nix_block, array_id):
+            """ Data array of a Block, resolved to the store if its data are shared """
+            nix_da = nix_block.data_arrays[array_id]
+
+            definition = nix_da.definition or ''
+            if definition.startswith(store_prefix):
+                nix_store = nix_file.blocks[store_block]
+                return StoredArray(nix_da, nix_store.data_arrays[definition[len(store_prefix):]])
+
+            return nix_da
+
+        @staticmethod
+        def get_live_data_array(nix_file, nix_block, array_id):
+            """ Data array of an object, preferring the array appended to if there is one """
+            try:
+                return nix_block.data_arrays[live_array_name(array_id)]
+            except KeyError:
+                return Reader.Help.get_data_array(nix_file, nix_block, array_id)
+
+        @staticmethod
+        def get_signal_base(nix_da):
+            """
+            Everything needed to build AnalogSignals from parts of a data array
+            (see read_signal_part), read once.
+            """
+            metadata = Reader.Help.get_metadata(nix_da.metadata)
+
+            s_dim = nix_da.dimensions[0]
+            sampling = s_dim.sampling_interval * getattr(pq, s_dim.unit)
+
+            return {
+                'params': {
+                    'name': Reader.Help.get_obj_neo_name(nix_da),
+                    'units': nix_da.unit,
+                    'dtype': Reader.Help.get_dtype(nix_da),
+                    'sampling_period': 1. / sampling if 'hz' in s_dim.unit.lower() else sampling,
+                },
+                't_start': Reader.Help.read_quantity(metadata, 't_start'),
+                'attributes': Reader.Help.read_attributes(metadata, 'analogsignal'),
+                'annotations': Reader.Help.read_annotations(metadata, 'analogsignal'),
+            }
+
+        @staticmethod
+        def read_signal_part(nix_da, base, start, stop):
+            """ AnalogSignal of samples start:stop of a data array, see get_signal_base """
+            params = base['params']
+            t_start = base['t_start']
+
+            signal = neo.AnalogSignal(signal=Reader.Help.read_data(nix_da, slice(start, stop)), **params)
+            signal.t_start = (t_start + start * params['sampling_period']).rescale(t_start.units)
+
+            for key, value in base['attributes'].items():
+                setattr(signal, key, value)
+
+            signal.annotations = dict(base['annotations'])
+
+            return signal
+
+        @staticmethod
+        def bisect(nix_da, value):
+            """
+            Position of value in a sorted 1-d data array, like bisect_left,
+            reading only the log2(n) elements compared on the way.
+            """
+            low, high = 0, nix_da.data_extent[0]
+
+            while low < high:
+                middle = (low + high) // 2
+                if nix_da[middle] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+
+            return low
+
+        @staticmethod
+        def get_dtype(nix_da):
+            """ dtype of the data as read, i.e. after scaling of stored integer codes """
+            if nix_da.polynom_coefficients:
+                return np.dtype(np.float64)
+            return nix_da.dtype
+
+        @staticmethod
+        def read_data(nix_da, index=slice(None)):
+            """
+            Reads a part of a data array, converting integer codes to values
+            with the polynomial coefficients (offset, gain) of the array.
+            """
+            data = nix_da[index]
+
+            coefficients = nix_da.polynom_coefficients
+            if coefficients and np.asarray(data).dtype.kind in 'iu':
+                data = np.polynomial.polynomial.polyval(data, coefficients)
+
+            return data
+
+        @staticmethod
+        def read_codes(nix_da, index=slice(None)):
+            """
+            Reads a part of a data array as stored: integer codes, also from
+            backends which apply the polynomial coefficients on read.
+            """
+            data = nix_da[index]
+
+            coefficients = nix_da.polynom_coefficients
+            if coefficients and nix_da.dtype.kind in 'iu' and np.asarray(data).dtype.kind == 'f':
+                offset, gain = coefficients  # see Writer.Help.encode_data
+                data = np.round((np.asarray(data) - offset) / gain).astype(nix_da.dtype)
+
+            return data
+
+        @staticmethod
+        def iter_chunks(nix_da, chunk_len, start=0, stop=None):
+            """ Yields consecutive slices of a data array along the first axis """
+            stop = nix_da.data_extent[0] if stop is None else stop
+
+            for i in range(start, stop, chunk_len):
+                yield Reader.Help.read_data(nix_da, slice(i, min(i + chunk_len, stop)))
+
+        @staticmethod
+        def get_moments(data):
+            """ Partial moments (count, mean, sum of squared deviations) per channel """
+            data = np.asarray(data, dtype=np.float64)
+            mean = data.mean(axis=0)
+
+            return {'n': len(data), 'mean': mean, 'm2': ((data - mean) ** 2).sum(axis=0)}
+
+        @staticmethod
+        def merge_moments(a, b):
+            """ Combines partial moments of two parts of the data, either may be None """
+            if a is None or not a['n']:
+                return b
+            if b is None or not b['n']:
+                return a
+
+            n = a['n'] + b['n']
+            delta = b['mean'] - a['mean']
+
+            return {
+                'n': n,
+                'mean': a['mean'] + delta * b['n'] / float(n),
+                'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / float(n),
+            }
+
+        @staticmethod
+        def read_reduced(nix_da, factor, mean=False, chunk_len=read_chunk_len):
+            """
+            Reads every factor-th sample of a data array (or, with mean=True,
+            means of consecutive blocks of factor samples, dropping the
+            incomplete last block) chunk by chunk, so that only the result and
+            a single chunk are kept in memory.
+            """
+            n = nix_da.data_extent[0]
+            n_out = n // factor if mean else (n + factor - 1) // factor
+            chunk_len = max(chunk_len // factor, 1) * factor
+
+            result = None
+            pos = 0
+            for chunk in Reader.Help.iter_chunks(nix_da, chunk_len):
+                if mean:
+                    usable = len(chunk) // factor * factor
+                    reduced = chunk[:usable].reshape((-1, factor) + chunk.shape[1:]).mean(axis=1)
+                else:
+                    reduced = chunk[::factor]
+
+                if result is None:
+                    result = np.empty((n_out,) + reduced.shape[1:], dtype=reduced.dtype)
+
+                result[pos:pos + len(reduced)] = reduced
+                pos += len(reduced)
+
+            if result is None:
+                result = np.empty((0,), dtype=nix_da.dtype)
+
+            return result
+
     @staticmethod
-    def read_block(fh, block_id):
+    def read_block(fh, block_id, **options):
         def read_segments(nix_file):
             tags = filter(lambda x: x.type == 'segment', nix_file.blocks[block_id].tags)
-            return [Reader.read_segment(fh, block_id, tag.name) for tag in tags]
+            return [Reader.read_segment(fh, block_id, tag.name, **options) for tag in tags]
 
         def read_recordingchannelgroups(nix_file):
             sources = filter(lambda x: x.type == 'recordingchannelgroup', nix_file.blocks[block_id].sources)
-            return [Reader.read_RCG(fh, block_id, src.name) for src in sources]
+            return [Reader.read_RCG(fh, block_id, src.name, **options) for src in sources]
 
         nix_block = fh.handle.blocks[block_id]
+        metadata = Reader.Help.get_metadata(nix_block.metadata)
 
-        b = Block(name=nix_block.name)
+        b = neo.Block(name=nix_block.name)
 
-        for key, value in Reader.Help.read_attributes(nix_block.metadata, 'block').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'block').items():
             setattr(b, key, value)
 
-        b.annotations = Reader.Help.read_annotations(nix_block.metadata, 'block')
+        b.annotations = Reader.Help.read_annotations(metadata, 'block')
 
         setattr(b, 'segments', ProxyList(fh, read_segments))
         setattr(b, 'recordingchannelgroups', ProxyList(fh, read_recordingchannelgroups))
 
+        Reader.Help.set_state(b, nix_block, nix_block.name)
+
         return b
 
     @staticmethod
-    def read_segment(fh, block_id, seg_id):
+    def read_segment(fh, block_id, seg_id, **options):
         def read_multiple(nix_file, obj_type):
             nix_tag = nix_file.blocks[block_id].tags[seg_id]
             objs = filter(lambda x: x.type == obj_type, nix_tag.references)
             read_func = getattr(Reader, 'read_' + obj_type)
-            return [read_func(fh, block_id, da.name) for da in objs]
+            return [read_func(fh, block_id, da.name, **options) for da in objs]
 
         nix_block = fh.handle.blocks[block_id]
         nix_tag = nix_block.tags[seg_id]
+        metadata = Reader.Help.get_metadata(nix_tag.metadata)
 
-        seg = Segment(name=nix_tag.name)
+        seg = neo.Segment(name=nix_tag.name)
 
-        for key, value in Reader.Help.read_attributes(nix_tag.metadata, 'segment').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'segment').items():
             setattr(seg, key, value)
 
-        seg.annotations = Reader.Help.read_annotations(nix_tag.metadata, 'segment')
+        seg.annotations = Reader.Help.read_annotations(metadata, 'segment')
 
         setattr(seg, 'analogsignals', ProxyList(fh, lambda f: read_multiple(f, 'analogsignal')))
         setattr(seg, 'irregularlysampledsignals', ProxyList(fh, lambda f: read_multiple(f, 'irregularlysampledsignal')))
@@ -249,134 +795,287 @@ class Reader:
         setattr(seg, 'events', ProxyList(fh, lambda f: read_multiple(f, 'event')))
         setattr(seg, 'epochs', ProxyList(fh, lambda f: read_multiple(f, 'epoch')))
 
+        Reader.Help.set_state(seg, nix_block, nix_tag.name)
+
         return seg
 
     @staticmethod
-    def read_RCG(fh, block_id, rcg_id):
+    def read_RCG(fh, block_id, rcg_id, **options):
         def read_multiple(nix_file, obj_type):
             signals = filter(lambda x: x.type == obj_type, nix_file.blocks[block_id].data_arrays)
             signals = [x for x in signals if nsn in [y.name for y in x.sources]]
             read_func = getattr(Reader, 'read_' + obj_type)
-            return [read_func(fh, block_id, da.name) for da in signals]
+            return [read_func(fh, block_id, da.name, **options) for da in signals]
 
         def read_units(nix_file):
             units = filter(lambda x: x.type == 'unit', nix_file.blocks[block_id].sources[nsn].sources)
-            return [Reader.read_unit(fh, block_id, nsn, unit.name) for unit in units]
+            return [Reader.read_unit(fh, block_id, nsn, unit.name, **options) for unit in units]
 
         nix_block = fh.handle.blocks[block_id]
         nix_source = nix_block.sources[rcg_id]
         nsn = nix_source.name
+        metadata = Reader.Help.get_metadata(nix_source.metadata)
 
         params = {
             'name': nix_source.name,
-            'channel_indexes': nix_source.metadata['channel_indexes']
+            'channel_indexes': metadata['channel_indexes']
         }
-        rcg = RecordingChannelGroup(**params)
+        rcg = neo.RecordingChannelGroup(**params)
 
-        for key, value in Reader.Help.read_attributes(nix_source.metadata, 'recordingchannelgroup').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'recordingchannelgroup').items():
             setattr(rcg, key, value)
 
-        rcg.annotations = Reader.Help.read_annotations(nix_source.metadata, 'recordingchannelgroup')
+        rcg.annotations = Reader.Help.read_annotations(metadata, 'recordingchannelgroup')
 
         setattr(rcg, 'analogsignals', ProxyList(fh, lambda f: read_multiple(f, 'analogsignal')))
         setattr(rcg, 'irregularlysampledsignals', ProxyList(fh, lambda f: read_multiple(f, 'irregularlysampledsignal')))
         setattr(rcg, 'units', ProxyList(fh, read_units))
 
+        Reader.Help.set_state(rcg, nix_block, nsn)
+
         return rcg
 
     @staticmethod
-    def read_unit(fh, block_id, rcg_source_id, unit_id):
+    def read_unit(fh, block_id, rcg_source_id, unit_id, **options):
         def read_spiketrains(nix_file):
             strains = filter(lambda x: x.type == 'spiketrain', nix_file.blocks[block_id].data_arrays)
             strains = [x for x in strains if nsn in [y.name for y in x.sources]]
-            return [Reader.read_spiketrain(fh, block_id, da.name) for da in strains]
+            return [Reader.read_spiketrain(fh, block_id, da.name, **options) for da in strains]
 
         nix_block = fh.handle.blocks[block_id]
         nix_rcg_source = nix_block.sources[rcg_source_id]
         nix_source = nix_rcg_source.sources[unit_id]
         nsn = nix_source.name
+        metadata = Reader.Help.get_metadata(nix_source.metadata)
 
-        rcg = Unit(nix_source.name)
+        rcg = neo.Unit(nix_source.name)
 
-        for key, value in Reader.Help.read_attributes(nix_source.metadata, 'unit').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'unit').items():
             setattr(rcg, key, value)
 
-        rcg.annotations = Reader.Help.read_annotations(nix_source.metadata, 'unit')
+        rcg.annotations = Reader.Help.read_annotations(metadata, 'unit')
 
         setattr(rcg, 'spiketrains', ProxyList(fh, read_spiketrains))
 
+        Reader.Help.set_state(rcg, nix_block, nsn)
+
         return rcg
 
     @staticmethod
-    def read_analogsignal(fh, block_id, array_id):
+    def read_analogsignal(fh, block_id, array_id, **options):
+        """
+        Supported options:
+
+        :param max_points:  if the signal is longer, read the min/max envelope
+                            from the finest stored decimation level (see the
+                            Writer 'pyramid' option) with no more samples, or
+                            every k-th sample if there are no stored levels
+        :param step:        read every step-th sample only
+        :param downsample:  read means of blocks of downsample samples
+                            (signals read reduced cannot be written back
+                            once changed)
+        :param shared_memory:   a started SharedMemoryManager, to put the data
+                            of this (and every other) data object into shared
+                            memory freed on its shutdown; such objects are
+                            pickled as references (see neo2nix.sharedmem)
+        """
         nix_block = fh.handle.blocks[block_id]
-        nix_da = nix_block.data_arrays[array_id]
+        nix_da = Reader.Help.get_data_array(fh.handle, nix_block, array_id)
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
 
         params = {
             'name': Reader.Help.get_obj_neo_name(nix_da),
-            'signal': nix_da[:],  # TODO think about lazy data loading
             'units': nix_da.unit,
-            'dtype': nix_da.dtype,
+            'dtype': Reader.Help.get_dtype(nix_da),
         }
 
         s_dim = nix_da.dimensions[0]
         sampling = s_dim.sampling_interval * getattr(pq, s_dim.unit)
-        if 'hz' in s_dim.unit.lower():
+        is_rate = 'hz' in s_dim.unit.lower()
+
+        level = None
+        step = options.get('downsample') or options.get('step')
+
+        n = nix_da.data_extent[0]
+        max_points = options.get('max_points')
+        if max_points and n > max_points:
+            level = Reader.Help.get_pyramid_level(nix_block, array_id, max_points)
+            if level is None:
+                step = (n + max_points - 1) // max_points
+
+        if level is not None:
+            factor, nix_level = level
+            data = nix_level[:]  # min/max pairs are interleaved
+            params['signal'] = data.reshape((-1,) + data.shape[2:])
+            params['dtype'] = nix_level.dtype
+            sampling = sampling * 2 / factor if is_rate else sampling * factor / 2
+
+        elif step and step > 1:
+            mean = bool(options.get('downsample'))
+            params['signal'] = Reader.Help.read_reduced(nix_da, step, mean, fh.chunk_len(nix_da))
+            params['dtype'] = params['signal'].dtype
+            sampling = sampling / step if is_rate else sampling * step
+
+        else:
+            params['signal'] = Reader.Help.read_data(nix_da)
+
+        if is_rate:
             params['sampling_rate'] = sampling
         else:
             params['sampling_period'] = sampling
 
-        signal = AnalogSignal(**params)
-        signal.t_start = Reader.Help.read_quantity(nix_da.metadata, 't_start')
+        signal = neo.AnalogSignal(**params)
+        signal.t_start = Reader.Help.read_quantity(metadata, 't_start')
 
-        for key, value in Reader.Help.read_attributes(nix_da.metadata, 'analogsignal').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'analogsignal').items():
             setattr(signal, key, value)
 
-        signal.annotations = Reader.Help.read_annotations(nix_da.metadata, 'analogsignal')
+        signal.annotations = Reader.Help.read_annotations(metadata, 'analogsignal')
+        if level is not None:
+            signal.annotations['decimation'] = level[0]
+
+        if options.get('shared_memory') is not None:
+            signal = Reader.Help.share(signal, options['shared_memory'])
+
+        Reader.Help.set_state(signal, nix_block, array_id, derived=level is not None or bool(step and step > 1))
 
         return signal
 
     @staticmethod
-    def read_irregularlysampledsignal(fh, block_id, array_id):
+    def iter_analogsignal_chunks(fh, block_id, array_id, chunk_duration, overlap=None):
+        """
+        Yields an AnalogSignal in consecutive pieces of chunk_duration (the
+        last one may be shorter), reading one piece at a time.
+
+        :param overlap:     duration shared by consecutive pieces, so that a
+                            new piece starts chunk_duration - overlap after
+                            the previous one
+        """
         nix_block = fh.handle.blocks[block_id]
-        nix_da = nix_block.data_arrays[array_id]
+        nix_da = Reader.Help.get_data_array(fh.handle, nix_block, array_id)
+        base = Reader.Help.get_signal_base(nix_da)
+        period = base['params']['sampling_period']
+
+        chunk_len = int(round((chunk_duration / period).simplified.magnitude))
+        overlap_len = 0
+        if overlap is not None:
+            overlap_len = int(round((overlap / period).simplified.magnitude))
+        if not 0 <= overlap_len < chunk_len:
+            raise ValueError("overlap must be shorter than chunk_duration")
+
+        n = nix_da.data_extent[0]
+        for start in range(0, max(n - overlap_len, 1), chunk_len - overlap_len):
+            yield Reader.Help.read_signal_part(nix_da, base, start, min(start + chunk_len, n))
+
+    @staticmethod
+    def read_analogsignal_tail(fh, block_id, array_id, duration):
+        """ Reads the last duration of an AnalogSignal, e.g. of one being recorded """
+        nix_block = fh.handle.blocks[block_id]
+        nix_da = Reader.Help.get_live_data_array(fh.handle, nix_block, array_id)
+        base = Reader.Help.get_signal_base(nix_da)
+        period = base['params']['sampling_period']
+
+        n = nix_da.data_extent[0]
+        start = max(n - int(round((duration / period).simplified.magnitude)), 0)
+
+        return Reader.Help.read_signal_part(nix_da, base, start, n)
+
+    @staticmethod
+    def read_samples(fh, block_id, array_id, start=0, stop=None):
+        """
+        Reads samples (spike times for SpikeTrains) start:stop of a data
+        array as a Quantity array, without reading any metadata. Arrays
+        appended to are found by their original name too.
+
+        :return:    (Quantity array, number of samples in the array)
+        """
+        nix_block = fh.handle.blocks[block_id]
+        nix_da = Reader.Help.get_live_data_array(fh.handle, nix_block, array_id)
+
+        n = nix_da.data_extent[0]
+        stop = n if stop is None else min(stop, n)
+        data = Reader.Help.read_data(nix_da, slice(start, max(start, stop)))
+
+        return pq.Quantity(data, nix_da.unit), n
+
+    @staticmethod
+    def read_irregularlysampledsignal(fh, block_id, array_id, **options):
+        """
+        Supported options:
+
+        :param time_window: (start, stop) Quantities, either may be None, to
+                            read only the samples with start <= time < stop.
+                            Times stored as a side array (see the Writer
+                            'times_array' option) are searched on disk.
+                            Signals read in part cannot be written back once
+                            changed.
+        """
+        nix_block = fh.handle.blocks[block_id]
+        nix_da = Reader.Help.get_data_array(fh.handle, nix_block, array_id)
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
+
+        dim = nix_da.dimensions[0]
+        if isinstance(dim, nix.RangeDimension):
+            ticks = np.asarray(dim.ticks)
+            time_units = dim.unit
+            find = lambda t: int(np.searchsorted(ticks, t))
+            read_times = lambda start, stop: ticks[start:stop]
+        else:
+            nix_times = nix_block.data_arrays[side_array_name(array_id, 'times')]
+            time_units = nix_times.unit
+            find = lambda t: Reader.Help.bisect(nix_times, t)
+            read_times = lambda start, stop: nix_times[start:stop]
+
+        n = nix_da.data_extent[0]
+        start, stop = 0, n
+        t_from, t_to = options.get('time_window') or (None, None)
+        if t_from is not None:
+            start = find(float(t_from.rescale(time_units).magnitude))
+        if t_to is not None:
+            stop = max(find(float(t_to.rescale(time_units).magnitude)), start)
 
         params = {
             'name': Reader.Help.get_obj_neo_name(nix_da),
-            'signal': nix_da[:],  # TODO think about lazy data loading
+            'signal': Reader.Help.read_data(nix_da, slice(start, stop)),
             'units': nix_da.unit,
-            'times': nix_da.dimensions[0].ticks,
-            'time_units': nix_da.dimensions[0].unit,
-            'dtype': nix_da.dtype,
+            'times': read_times(start, stop),
+            'time_units': time_units,
+            'dtype': Reader.Help.get_dtype(nix_da),
         }
 
-        signal = IrregularlySampledSignal(**params)
+        signal = neo.IrregularlySampledSignal(**params)
 
-        for key, value in Reader.Help.read_attributes(nix_da.metadata, 'irregularlysampledsignal').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'irregularlysampledsignal').items():
             setattr(signal, key, value)
 
-        signal.annotations = Reader.Help.read_annotations(nix_da.metadata, 'irregularlysampledsignal')
+        signal.annotations = Reader.Help.read_annotations(metadata, 'irregularlysampledsignal')
+
+        if options.get('shared_memory') is not None:
+            signal = Reader.Help.share(signal, options['shared_memory'])
+
+        Reader.Help.set_state(signal, nix_block, array_id, derived=start > 0 or stop < n)
 
         return signal
 
     @staticmethod
-    def read_spiketrain(fh, block_id, array_id):
+    def read_spiketrain(fh, block_id, array_id, **options):
         nix_block = fh.handle.blocks[block_id]
         nix_da = nix_block.data_arrays[array_id]
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
 
         params = {
             'times': nix_da[:],  # TODO think about lazy data loading
             'dtype': nix_da.dtype,
-            't_start': Reader.Help.read_quantity(nix_da.metadata, 't_start'),
-            't_stop': Reader.Help.read_quantity(nix_da.metadata, 't_stop')
+            't_start': Reader.Help.read_quantity(metadata, 't_start'),
+            't_stop': Reader.Help.read_quantity(metadata, 't_stop')
         }
 
         name = Reader.Help.get_obj_neo_name(nix_da)
         if name:
             params['name'] = name
 
-        if 'left_sweep' in nix_da.metadata:
-            params['left_sweep'] = Reader.Help.read_quantity(nix_da.metadata, 'left_sweep')
+        if 'left_sweep' in metadata:
+            params['left_sweep'] = Reader.Help.read_quantity(metadata, 'left_sweep')
 
         if len(nix_da.dimensions) > 0:
             s_dim = nix_da.dimensions[0]
@@ -385,19 +1084,25 @@ class Reader:
         if nix_da.unit:
             params['units'] = nix_da.unit
 
-        st = SpikeTrain(**params)
+        st = neo.SpikeTrain(**params)
 
-        for key, value in Reader.Help.read_attributes(nix_da.metadata, 'spiketrain').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'spiketrain').items():
             setattr(st, key, value)
 
-        st.annotations = Reader.Help.read_annotations(nix_da.metadata, 'spiketrain')
+        st.annotations = Reader.Help.read_annotations(metadata, 'spiketrain')
+
+        if options.get('shared_memory') is not None:
+            st = Reader.Help.share(st, options['shared_memory'])
+
+        Reader.Help.set_state(st, nix_block, array_id)
 
         return st
 
     @staticmethod
-    def read_event(fh, block_id, array_id):
+    def read_event(fh, block_id, array_id, **options):
         nix_block = fh.handle.blocks[block_id]
         nix_da = nix_block.data_arrays[array_id]
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
 
         params = {
             'times': nix_da[:],  # TODO think about lazy data loading
@@ -408,20 +1113,23 @@ class Reader:
         if name:
             params['name'] = name
 
-        event = Event(**params)
+        event = neo.Event(**params)
 
-        for key, value in Reader.Help.read_attributes(nix_da.metadata, 'event').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'event').items():
             setattr(event, key, value)
 
-        event.annotations = Reader.Help.read_annotations(nix_da.metadata, 'event')
+        event.annotations = Reader.Help.read_annotations(metadata, 'event')
+
+        Reader.Help.set_state(event, nix_block, array_id)
 
         return event
 
 
     @staticmethod
-    def read_epoch(fh, block_id, array_id):
+    def read_epoch(fh, block_id, array_id, **options):
         nix_block = fh.handle.blocks[block_id]
         nix_da = nix_block.data_arrays[array_id]
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
 
         params = {
             'times': nix_da[0],  # TODO think about lazy data loading
@@ -433,74 +1141,460 @@ class Reader:
         if name:
             params['name'] = name
 
-        epoch = Epoch(**params)
+        epoch = neo.Epoch(**params)
 
-        for key, value in Reader.Help.read_attributes(nix_da.metadata, 'epoch').items():
+        for key, value in Reader.Help.read_attributes(metadata, 'epoch').items():
             setattr(epoch, key, value)
 
-        epoch.annotations = Reader.Help.read_annotations(nix_da.metadata, 'epoch')
+        epoch.annotations = Reader.Help.read_annotations(metadata, 'epoch')
+
+        Reader.Help.set_state(epoch, nix_block, array_id)
 
         return epoch
 
+    @staticmethod
+    def read_spike_counts(fh, block_id, bin_size, t_start=None, t_stop=None, seg_id=None):
+        """
+        Counts spikes of every Unit of a Block (or only of a Segment's
+        SpikeTrains) in bins of bin_size, streaming the spike times chunk by
+        chunk. No Neo objects are created. SpikeTrains not assigned to any
+        Unit get a row of their own.
+
+        :param t_start:     start of the first bin; by default the earliest
+                            t_start of the SpikeTrains
+        :param t_stop:      end of the time range; by default the latest
+                            t_stop of the SpikeTrains
+        :return:            (counts, labels, bin_edges) - integer array of
+                            shape (rows, bins), names of the rows
+                            ('<RCG>/<Unit>' for Units) and a Quantity array
+                            of bins + 1 edges; no bins and no edges if the
+                            range is not given and there are no SpikeTrains
+        :raises ValueError: if t_stop is before t_start
+        """
+        nix_block = fh.handle.blocks[block_id]
 
-class Writer:
-    """
-    Class to write Neo objects to NIX
+        if seg_id is None:
+            arrays = nix_block.data_arrays
+        else:
+            arrays = nix_block.tags[seg_id].references
+        strains = [x for x in arrays if x.type == 'spiketrain']
+
+        labels = []
+        row_of = {}  # NIX id of a Unit source: row, as Unit names are unique per RCG only
+        for rcg in nix_block.sources:
+            for unit in [x for x in rcg.sources if x.type == 'unit']:
+                row_of[unit.id] = len(labels)
+                labels.append(rcg.name + '/' + unit.name)
+
+        assigned = []  # (row, data array)
+        for nix_da in strains:
+            linked = [row_of[x.id] for x in nix_da.sources if x.id in row_of]
+            if not linked:
+                row_of[nix_da.id] = len(labels)
+                labels.append(Reader.Help.get_obj_neo_name(nix_da) or nix_da.name)
+                linked = [row_of[nix_da.id]]
+            assigned.append((linked[0], nix_da))
+
+        units = bin_size.units
+        if (t_start is None or t_stop is None) and not strains:
+            return np.zeros((len(labels), 0), dtype=np.int64), labels, np.zeros(0) * units
+
+        if t_start is None or t_stop is None:
+            metadata = [Reader.Help.get_metadata(x.metadata) for x in strains]
+            if t_start is None:
+                t_start = min([Reader.Help.read_quantity(x, 't_start').rescale(units) for x in metadata])
+            if t_stop is None:
+                t_stop = max([Reader.Help.read_quantity(x, 't_stop').rescale(units) for x in metadata])
+
+        t0 = float(t_start.rescale(units).magnitude)
+        t1 = float(t_stop.rescale(units).magnitude)
+        if t1 < t0:
+            raise ValueError("t_stop %s is before t_start %s" % (t_stop, t_start))
+        width = float(bin_size.magnitude)
+        n_bins = int(np.ceil((t1 - t0) / width))
+
+        counts = np.zeros((len(labels), n_bins), dtype=np.int64)
+        for row, nix_da in assigned:
+            scale = float(pq.Quantity(1, nix_da.unit).rescale(units).magnitude)
+
+            for chunk in Reader.Help.iter_chunks(nix_da, fh.chunk_len(nix_da)):
+                times = np.asarray(chunk, dtype=np.float64) * scale
+                times = times[(times >= t0) & (times < t1)]
+                bins = ((times - t0) / width).astype(np.int64)
+                counts[row] += np.bincount(np.minimum(bins, n_bins - 1), minlength=n_bins)
+
+        edges = (t0 + width * np.arange(n_bins + 1)) * units
+
+        return counts, labels, edges
 
-    Fully static
-    """
+    @staticmethod
+    def read_segment_stats(fh, block_id, seg_id):
+        """
+        Streams the data arrays of a Segment chunk by chunk to compute partial
+        statistics, without creating Neo objects. Partials of several
+        Segments can be combined, see neo2nix.stats.
+
+        :return:    dict with
+                    'signals': {array name: moments (see Help.get_moments)
+                               with signal 'name' and 'units'},
+                    'units': {'<RCG>/<Unit>': {'count': spikes, 'duration': s}}
+                             (SpikeTrains with no Unit by their own name),
+                    'events': {label: number of events}
+        """
+        nix_block = fh.handle.blocks[block_id]
+        nix_tag = nix_block.tags[seg_id]
 
-    class Help:
-        @staticmethod
-        def get_classname(neo_obj):
-            return neo_obj.__class__.__name__.lower()
+        units = {}  # NIX id of a Unit source: label, as Unit names are unique per RCG only
+        for rcg in nix_block.sources:
+            units.update([(x.id, rcg.name + '/' + x.name) for x in rcg.sources if x.type == 'unit'])
 
-        @staticmethod
-        def get_obj_nix_name(neo_obj):
-            obj_type = Writer.Help.get_classname(neo_obj)
+        result = {'signals': {}, 'units': {}, 'events': {}}
 
-            if obj_type in ['analogsignal', 'irregularlysampledsignal', 'spiketrain']:
-                return str(hash(neo_obj.tostring()))
-            elif obj_type in ['event', 'epoch']:
-                return str(hash(neo_obj.times.tostring()))
-            return neo_obj.name
+        for ref in nix_tag.references:
+            if ref.type in ('analogsignal', 'irregularlysampledsignal'):
+                nix_da = Reader.Help.get_data_array(fh.handle, nix_block, ref.name)
 
-        @staticmethod
-        def extract_metadata(neo_obj):  # pure
-            metadata = dict(neo_obj.annotations)
+                moments = None
+                for chunk in Reader.Help.iter_chunks(nix_da, fh.chunk_len(nix_da)):
+                    moments = Reader.Help.merge_moments(moments, Reader.Help.get_moments(chunk))
 
-            obj_type = Writer.Help.get_classname(neo_obj)
-            for attr_name in simple_attrs['default'] + simple_attrs[obj_type]:
-                if getattr(neo_obj, attr_name, None) is not None:
-                    metadata[attr_name] = getattr(neo_obj, attr_name)
+                if moments is not None:
+                    moments.update(name=Reader.Help.get_obj_neo_name(ref), units=ref.unit)
+                    result['signals'][ref.name] = moments
 
-            return metadata
+            elif ref.type == 'spiketrain':
+                linked = [units[x.id] for x in ref.sources if x.id in units]
+                label = linked[0] if linked else Reader.Help.get_obj_neo_name(ref) or ref.name
 
-        @staticmethod
-        def get_or_create_section(root_section, group_name, name):
-            if not isinstance(root_section, nix.Section):
-                group_sec = root_section  # file is a root section for Blocks
-            else:
-                try:
-                    group_sec = root_section.sections[group_name + 's']
-                except KeyError:
-                    group_sec = root_section.create_section(group_name + 's', group_name)
+                metadata = Reader.Help.get_metadata(ref.metadata)
+                t_start = Reader.Help.read_quantity(metadata, 't_start')
+                t_stop = Reader.Help.read_quantity(metadata, 't_stop')
 
-            try:
-                target_sec = group_sec.sections[name]
-            except KeyError:
-                target_sec = group_sec.create_section(name, group_name)
+                counts = result['units'].setdefault(label, {'count': 0, 'duration': 0.})
+                counts['count'] += ref.data_extent[0]
+                counts['duration'] += float((t_stop - t_start).rescale(pq.s).magnitude)
 
-            return target_sec
+            elif ref.type == 'event':
+                for label in ref.dimensions[0].labels:
+                    result['events'][label] = result['events'].get(label, 0) + 1
 
-        @staticmethod
-        def write_metadata(nix_section, dict_to_store):
-            def make_nix_values(value):
-                if not type(value) in (list, tuple):
+        return result
+
+    @staticmethod
+    def read_analogsignal_summary(fh, block_id, array_id):
+        """
+        Reads per-chunk summary statistics of an AnalogSignal, stored by the
+        Writer with the 'summary_chunk' option. Signal samples are not read.
+
+        :return:    dict with signal 'name', 't_start', 'chunk_duration' and
+                    a Quantity array for every statistic in summary_stats
+        """
+        nix_block = fh.handle.blocks[block_id]
+        nix_da = nix_block.data_arrays[array_id]
+        metadata = Reader.Help.get_metadata(nix_da.metadata)
+        nix_summary = nix_block.data_arrays[side_array_name(array_id, 'summary')]
+
+        c_dim = nix_summary.dimensions[0]
+        data = nix_summary[:]
+
+        result = {
+            'name': Reader.Help.get_obj_neo_name(nix_da),
+            't_start': Reader.Help.read_quantity(metadata, 't_start'),
+            'chunk_duration': pq.Quantity(c_dim.sampling_interval, c_dim.unit),
+        }
+        for i, stat in enumerate(summary_stats):
+            result[stat] = pq.Quantity(data[:, i], nix_da.unit)
+
+        return result
+
+    @staticmethod
+    def read_summaries(fh, block_id, seg_id=None):
+        """
+        Reads summaries of all AnalogSignals of a Block (or of a single
+        Segment) which have them stored.
+
+        :return:    dict {array name: summary} (see read_analogsignal_summary)
+        """
+        nix_block = fh.handle.blocks[block_id]
+
+        if seg_id is None:
+            arrays = nix_block.data_arrays
+        else:
+            arrays = nix_block.tags[seg_id].references
+
+        names = [x.name for x in nix_block.data_arrays]
+        signals = [x.name for x in arrays if x.type == 'analogsignal']
+        signals = [x for x in signals if side_array_name(x, 'summary') in names]
+
+        return dict([(x, Reader.read_analogsignal_summary(fh, block_id, x)) for x in signals])
+
+
+    @staticmethod
+    def read_index(nix_file):
+        """
+        Builds an index of all objects in a file from the metadata sections
+        only, without reading any data.
+
+        :return:    list of entries, dicts with 'block', 'type', 'nix_name',
+                    'name', 'parent' (RCG name for Units), 'attributes' and
+                    'annotations' of every object
+        """
+        entries = []
+
+        for nix_block in [x for x in nix_file.blocks if x.type == 'block']:
+            # sections of deleted objects are not removed, index only live ones
+            live = {('block', nix_block.name): None}
+            live.update([(('segment', x.name), None) for x in nix_block.tags])
+            live.update([((x.type, x.name), None) for x in nix_block.data_arrays])
+            for rcg in nix_block.sources:
+                live[('recordingchannelgroup', rcg.name)] = None
+                live.update([(('unit', x.name), rcg.name) for x in rcg.sources])
+
+            sections = [nix_block.metadata]
+            for group_sec in nix_block.metadata.sections:
+                sections += [x for x in group_sec.sections]
+
+            for nix_section in sections:
+                key = (nix_section.type, nix_section.name)
+                if key not in live:
+                    continue
+
+                metadata = Reader.Help.get_metadata(nix_section)
+                attributes = Reader.Help.read_attributes(metadata, nix_section.type)
+
+                entries.append({
+                    'block': nix_block.name,
+                    'type': nix_section.type,
+                    'nix_name': nix_section.name,
+                    'name': attributes.get('name', nix_section.name),
+                    'parent': live[key],
+                    'attributes': attributes,
+                    'annotations': Reader.Help.read_annotations(metadata, nix_section.type),
+                })
+
+        return entries
+
+    @staticmethod
+    def read_saved_index(nix_file):
+        """ Index saved with Writer.write_index, or None """
+        try:
+            record = nix_file.sections[index_section][record_prop]
+        except KeyError:
+            return None
+
+        return json.loads(record, object_hook=Reader.Help.decode_value)
+
+
+class Writer:
+    """
+    Class to write Neo objects to NIX
+
+    Fully static
+    """
+
+    class Help:
+        @staticmethod
+        def get_classname(neo_obj):
+            return neo_obj.__class__.__name__.lower()
+
+        @staticmethod
+        def get_obj_nix_name(neo_obj):
+            obj_type = Writer.Help.get_classname(neo_obj)
+
+            if obj_type in ['analogsignal', 'irregularlysampledsignal', 'spiketrain']:
+                return str(hash(neo_obj.tostring()))
+            elif obj_type in ['event', 'epoch']:
+                return str(hash(neo_obj.times.tostring()))
+            return neo_obj.name
+
+        @staticmethod
+        def extract_metadata(neo_obj):  # pure
+            metadata = dict(neo_obj.annotations)
+
+            obj_type = Writer.Help.get_classname(neo_obj)
+            for attr_name in simple_attrs['default'] + simple_attrs[obj_type]:
+                if getattr(neo_obj, attr_name, None) is not None:
+                    metadata[attr_name] = getattr(neo_obj, attr_name)
+
+            return metadata
+
+        @staticmethod
+        def get_signature(neo_obj):
+            """
+            A comparable digest of the name, attributes, annotations and all
+            other values written with the data (see data_attrs)
+            """
+            def digest(value):
+                if isinstance(value, pq.Quantity) and value.ndim > 0:
+                    return hash(value.magnitude.tostring()), str(value.dimensionality)
+                if isinstance(value, np.ndarray):
+                    return hash(value.tostring())
+                return repr(value)
+
+            metadata = Writer.Help.extract_metadata(neo_obj)
+            metadata['name'] = neo_obj.name
+
+            for attr_name in data_attrs.get(Writer.Help.get_classname(neo_obj), ()):
+                metadata['__' + attr_name] = getattr(neo_obj, attr_name, None)  # apart from annotations
+
+            return sorted([(k, digest(v)) for k, v in metadata.items()])
+
+        @staticmethod
+        def get_nix_name(neo_obj, nix_names=None):
+            """
+            get_obj_nix_name, hashing the data of an object only once per
+            write if a cache dict nix_names is given (see write_block)
+            """
+            if nix_names is None:
+                return Writer.Help.get_obj_nix_name(neo_obj)
+
+            try:
+                return nix_names[id(neo_obj)]
+            except KeyError:
+                name = nix_names[id(neo_obj)] = Writer.Help.get_obj_nix_name(neo_obj)
+                return name
+
+        @staticmethod
+        def get_state(neo_obj, nix_block, nix_name, nix_names=None):
+            state = {
+                'block': nix_block.id,  # unique across files, unlike names
+                'nix_name': nix_name,
+                'signature': Writer.Help.get_signature(neo_obj),
+            }
+            if Writer.Help.get_classname(neo_obj) not in child_attrs:
+                state['digest'] = Writer.Help.get_nix_name(neo_obj, nix_names)  # data objects
+
+            return state
+
+        @staticmethod
+        def check_derived(neo_obj):
+            """
+            Refuses to write a changed object which was read reduced or in part
+            (see Reader.Help.set_state), as it would replace the full data.
+            """
+            state = getattr(neo_obj, '_nix_state', None)
+            if state is not None and state.get('derived'):
+                raise ValueError("%s %s was read reduced or in part and cannot be written back"
+                                 % (Writer.Help.get_classname(neo_obj), state['nix_name']))
+
+        @staticmethod
+        def is_clean(neo_obj, nix_block=None, nix_names=None):
+            """
+            True if an object read from (or written to) nix_block, and its
+            whole subtree, was not changed since, so it does not need to be
+            written. Without nix_block, any Block it was read from counts.
+            """
+            state = getattr(neo_obj, '_nix_state', None)
+            if state is None:
+                return False
+
+            if nix_block is not None and not state['block'] == nix_block.id:
+                return False  # read from another Block or file
+
+            if Writer.Help.get_signature(neo_obj) != state['signature']:
+                return False
+
+            if 'digest' in state:
+                return Writer.Help.get_nix_name(neo_obj, nix_names) == state['digest']
+
+            obj_type = Writer.Help.get_classname(neo_obj)
+            return all([Writer.Help.is_clean_list(neo_obj, x, nix_block, nix_names) for x in child_attrs[obj_type]])
+
+        @staticmethod
+        def is_clean_list(neo_obj, attr_name, nix_block=None, nix_names=None):
+            """
+            True if the children collection of an object read from (or
+            written to) nix_block was not changed. Collections that were
+            never loaded are clean.
+            """
+            state = getattr(neo_obj, '_nix_state', None)
+            if state is None or not neo_obj.name == state['nix_name']:
+                return False  # new or renamed object, children are not in the file
+
+            if nix_block is not None and not state['block'] == nix_block.id:
+                return False
+
+            neo_objs = getattr(neo_obj, attr_name)
+            if isinstance(neo_objs, ProxyList):
+                if not neo_objs.is_loaded:
+                    return True
+                if neo_objs.is_modified():
+                    return False
+
+            elif not [id(x) for x in neo_objs] == state['children'].get(attr_name):
+                return False
+
+            return all([Writer.Help.is_clean(x, nix_block, nix_names) for x in neo_objs])
+
+        @staticmethod
+        def get_or_create_section(root_section, group_name, name):
+            if not isinstance(root_section, nix.Section):
+                group_sec = root_section  # file is a root section for Blocks
+            else:
+                try:
+                    group_sec = root_section.sections[group_name + 's']
+                except KeyError:
+                    group_sec = root_section.create_section(group_name + 's', group_name)
+
+            try:
+                target_sec = group_sec.sections[name]
+            except KeyError:
+                target_sec = group_sec.create_section(name, group_name)
+
+            return target_sec
+
+        @staticmethod
+        def encode_value(value):  # default for json
+            if isinstance(value, pq.Quantity):
+                return {'__quantity__': [value.magnitude.tolist(), value.units.dimensionality.string]}
+            if isinstance(value, (np.ndarray, np.generic)):
+                return value.tolist()
+            if isinstance(value, datetime.datetime):
+                return {'__datetime__': value.strftime('%Y-%m-%dT%H:%M:%S.%f')}
+            if isinstance(value, bytes):
+                return value.decode('UTF-8')
+
+            raise TypeError("%r can not be stored in a record" % value)
+
+        @staticmethod
+        def write_record(nix_section, dict_to_store):
+            """
+            Stores all metadata of an object (attributes, quantities and
+            annotations) as a single JSON property of its section.
+            """
+            to_store = dict([(k, v) for k, v in dict_to_store.items() if v is not None])
+            record = json.dumps(to_store, default=Writer.Help.encode_value, sort_keys=True)
+
+            for name in [x.name for x in nix_section.props if not x.name == record_prop]:
+                del nix_section.props[name]
+
+            Writer.Help.write_metadata(nix_section, {record_prop: record})
+
+        @staticmethod
+        def write_metadata(nix_section, dict_to_store, compact=False):
+            """
+            Writes metadata as a property per value. 0-d quantities are stored
+            as value and '<name>__unit' properties. With compact=True, all
+            metadata is stored as a single record (see write_record).
+            """
+            def make_nix_values(value):
+                if not type(value) in (list, tuple):
                     return [nix.Value(value)]
                 return [nix.Value(x) for x in value]
 
-            to_store = dict([(k, v) for k, v in dict_to_store.items() if v is not None])
+            if compact:
+                return Writer.Help.write_record(nix_section, dict_to_store)
+
+            to_store = {}
+            for attr_name, value in dict_to_store.items():
+                if isinstance(value, pq.Quantity) and value.ndim == 0:
+                    to_store[attr_name] = value.item()
+                    to_store[attr_name + '__unit'] = value.units.dimensionality.string
+                elif value is not None:
+                    to_store[attr_name] = value
+
+            if record_prop in nix_section and record_prop not in to_store:
+                del nix_section.props[record_prop]  # written in compact layout before
 
             for attr_name, value in to_store.items():
                 values = make_nix_values(value)
@@ -514,7 +1608,17 @@ class Writer:
                     p = nix_section.create_property(attr_name, values)
 
         @staticmethod
-        def write_many(nix_block, parent, neo_objs):
+        def update_metadata(nix_section, dict_to_store):
+            """ Changes some metadata values, keeping the layout of the section """
+            if record_prop in nix_section:
+                record = json.loads(nix_section[record_prop], object_hook=Reader.Help.decode_value)
+                record.update(dict_to_store)
+                Writer.Help.write_record(nix_section, record)
+            else:
+                Writer.Help.write_metadata(nix_section, dict_to_store)
+
+        @staticmethod
+        def write_many(nix_block, parent, neo_objs, **options):
 
             def update_references():
                 for name in to_remove:
@@ -548,15 +1652,41 @@ class Writer:
             elif isinstance(parent, nix.Tag):
                 existing = [x for x in existing if x in parent.references]
 
-            conv = Writer.Help.get_obj_nix_name
-            to_remove = set([x.name for x in existing]) - set([conv(x) for x in neo_objs])
-            to_append = set([conv(x) for x in neo_objs]) - set([x.name for x in existing])
+            # clean objects are in the file already under their stored names
+            nix_names = options.get('nix_names')
+            clean = [Writer.Help.is_clean(x, nix_block, nix_names) for x in neo_objs]
+            names = [x._nix_state['nix_name'] if is_clean else Writer.Help.get_nix_name(x, nix_names)
+                     for x, is_clean in zip(neo_objs, clean)]
+
+            # arrays appended to in the file are there under their live names
+            existing_names = set([x.name for x in existing])
+            for i, (obj, is_clean) in enumerate(zip(neo_objs, clean)):
+                state = getattr(obj, '_nix_state', None)
+                if state is None or not state['block'] == nix_block.id:
+                    continue
+                if live_array_name(state['nix_name']) in existing_names:
+                    if not is_clean:
+                        raise ValueError("%s was appended to in the file, read it again to change it"
+                                         % state['nix_name'])
+                    names[i] = live_array_name(state['nix_name'])
+
+            to_remove = set([x.name for x in existing]) - set(names)
+            to_append = set(names) - set([x.name for x in existing])
 
             write_func = getattr(Writer, 'write_' + obj_type)
             args = (nix_block, parent.name) if obj_type == 'unit' else (nix_block,)
-            for obj in neo_objs:
+            # children of containers written with recursive=False are not saved
+            saved = options.get('recursive', True) or obj_type not in child_attrs
+
+            for obj, name, is_clean in zip(neo_objs, names, clean):
+                if is_clean:
+                    continue
+
                 all_args = args + (obj,)
-                write_func(*all_args)
+                write_func(*all_args, **options)
+
+                if saved:
+                    Reader.Help.set_state(obj, nix_block, name, nix_names=nix_names)
 
             if isinstance(parent, nix.Source) and not obj_type == 'unit':
                 update_sources()
@@ -568,77 +1698,495 @@ class Writer:
                 for name in to_remove:
                     del nix_objs[name]
 
+        @staticmethod
+        def link_sources(nix_block, neo_obj, nix_array):
+            """
+            Links a data array to the Unit (for spike trains) or RCG (for
+            signals) of its Neo object, if these are already in the file.
+            """
+            unit = getattr(neo_obj, 'unit', None)
+            rcg = getattr(neo_obj, 'recordingchannelgroup', None)
+
+            try:
+                if getattr(unit, 'recordingchannelgroup', None) is not None:
+                    rcg_source = nix_block.sources[unit.recordingchannelgroup.name]
+                    source = rcg_source.sources[unit.name]
+                elif rcg is not None:
+                    source = nix_block.sources[rcg.name]
+                else:
+                    return
+            except KeyError:
+                return
+
+            if source not in nix_array.sources:
+                nix_array.sources.append(source)
+
         @staticmethod
         def clean(nix_block):
-            """ clean up: del all arrays with no tag/source """
+            """ clean up: del all arrays with no tag/source and their side arrays """
             def has_references(nix_array):
                 return len([x for x in nix_block.tags if nix_array in x.references]) > 0
 
             def has_sources(nix_array):
                 return len(nix_array.sources) > 0
 
-            names = [x.name for x in nix_block.data_arrays]
+            names = [x.name for x in nix_block.data_arrays if x.type not in side_array_types]
             for name in names:
                 da = nix_block.data_arrays[name]
                 if not has_references(da) and not has_sources(da):
                     del nix_block.data_arrays[name]
 
+            names = [x.name for x in nix_block.data_arrays]
+            side_names = [x.name for x in nix_block.data_arrays if x.type in side_array_types]
+            for name in side_names:
+                if name.rsplit('__', 1)[0] not in names:
+                    del nix_block.data_arrays[name]
+
+        @staticmethod
+        def compute_summary(data, chunk_size):
+            """
+            Computes min, max, mean and RMS (see summary_stats) for every chunk
+            of chunk_size samples along the first axis of data.
+
+            :return:    array of shape (n_chunks, len(summary_stats), ...)
+            """
+            data = np.asarray(data, dtype=np.float64)
+            starts = np.arange(0, len(data), chunk_size)
+
+            counts = np.diff(np.append(starts, len(data)))
+            counts = counts.reshape((-1,) + (1,) * (data.ndim - 1))
+
+            mins = np.minimum.reduceat(data, starts)
+            maxs = np.maximum.reduceat(data, starts)
+            means = np.add.reduceat(data, starts) / counts
+            rms = np.sqrt(np.add.reduceat(data ** 2, starts) / counts)
+
+            return np.stack([mins, maxs, means, rms], axis=1)
+
+        @staticmethod
+        def write_summary(nix_block, nix_array, signal, chunk_size):
+            name = side_array_name(nix_array.name, 'summary')
+            chunk_duration = (chunk_size * signal.sampling_period).item()
+
+            try:
+                nix_summary = nix_block.data_arrays[name]
+
+                if nix_summary.dimensions[0].sampling_interval == chunk_duration:
+                    return nix_summary
+                del nix_block.data_arrays[name]
+
+            except KeyError:
+                pass
+
+            if not len(signal):
+                return None
+
+            data = Writer.Help.compute_summary(signal.magnitude, chunk_size)
+
+            args = (name, 'analogsignal_summary', data.dtype)
+            nix_summary = nix_block.create_data_array(*args, data=data)
+
+            nix_summary.append_sampled_dimension(chunk_duration)
+            nix_summary.dimensions[0].unit = signal.sampling_period.units.dimensionality.string
+            nix_summary.append_set_dimension()
+            nix_summary.dimensions[1].labels = summary_stats
+
+            return nix_summary
+
+        @staticmethod
+        def write_times(nix_block, nix_array, times):
+            """
+            Stores the times of an IrregularlySampledSignal as a '<name>__times'
+            side array, written in chunks, so that they can be read in parts.
+            """
+            name = side_array_name(nix_array.name, 'times')
+            data = np.asarray(times.magnitude)
+
+            nix_times = nix_block.create_data_array(name, 'irregularlysampledsignal_times', data.dtype, (0,))
+            for i in range(0, len(data), read_chunk_len):
+                nix_times.append(data[i:i + read_chunk_len])
+
+            nix_times.unit = times.units.dimensionality.string
+
+            return nix_times
+
+        @staticmethod
+        def encode_data(data, dtype):
+            """
+            Converts data to a storage dtype. For integer types, the values are
+            scaled to the full range of the type.
+
+            :return:    (converted data, polynomial coefficients (offset, gain)
+                        to restore the values or None)
+            """
+            data = np.asarray(data)
+            dtype = np.dtype(dtype)
+
+            if dtype.kind == 'f' or not data.size:
+                return data.astype(dtype), None
+
+            info = np.iinfo(dtype)
+            low, high = float(data.min()), float(data.max())
+
+            gain = (high - low) / (float(info.max) - float(info.min)) or 1.0
+            offset = low - info.min * gain
+
+            codes = np.clip(np.round((data - offset) / gain), info.min, info.max)
+            return codes.astype(dtype), (offset, gain)
+
+        @staticmethod
+        def create_signal_array(nix_block, obj_name, obj_type, signal, storage_dtype=None, store=None):
+            """
+            :param store:   store Block of the file (see get_store) to keep the
+                            data in, shared by all arrays with equal data
+            """
+            if storage_dtype is None:
+                data, coefficients = signal, None
+            else:
+                data, coefficients = Writer.Help.encode_data(signal.magnitude, storage_dtype)
+
+            if store is not None:
+                args = (obj_name, obj_type, data.dtype, (0,) + data.shape[1:])
+                nix_array = nix_block.create_data_array(*args)
+                user = nix_block.name + '/' + obj_name
+                nix_array.definition = store_prefix + Writer.Help.store_data(store, user, data, coefficients)
+                return nix_array
+
+            args = (obj_name, obj_type, data.dtype, (0,1))
+            nix_array = nix_block.create_data_array(*args)
+            nix_array.append(data)
+
+            if coefficients is not None:
+                nix_array.polynom_coefficients = coefficients
+
+            return nix_array
+
+        @staticmethod
+        def get_store(nix_file):
+            """ The store Block of a file, created if there is none """
+            try:
+                return nix_file.blocks[store_block]
+            except KeyError:
+                nix_store = nix_file.create_block(store_block, 'store')
+
+            try:
+                nix_store.metadata = nix_file.sections[store_block]
+            except KeyError:
+                nix_store.metadata = nix_file.create_section(store_block, 'store')
+
+            return nix_store
+
+        @staticmethod
+        def get_digest(data, coefficients=None):
+            """ Digest of array contents, stable across processes """
+            data = np.ascontiguousarray(data)
+
+            digest = hashlib.sha1(data.tostring())
+            digest.update(repr((data.dtype.str, data.shape, coefficients)).encode('UTF-8'))
+
+            return digest.hexdigest()
+
+        @staticmethod
+        def store_data(nix_store, user, data, coefficients=None):
+            """
+            Keeps the data of an array of a Block in the store, once per
+            distinct content. Every stored array counts the arrays using it
+            ('<block>/<array>' names, in the section of the stored array), see
+            Writer.sweep_store.
+
+            :return:    digest, the name of the stored array
+            """
+            digest = Writer.Help.get_digest(data, coefficients)
+
+            try:
+                nix_stored = nix_store.data_arrays[digest]
+            except KeyError:
+                nix_stored = nix_store.create_data_array(digest, 'stored', data.dtype, (0,) + data.shape[1:])
+                nix_stored.append(data)
+
+                if coefficients is not None:
+                    nix_stored.polynom_coefficients = coefficients
+
+                nix_stored.metadata = nix_store.metadata.create_section(digest, 'stored')
+                users = []
+            else:
+                users = json.loads(nix_stored.metadata[record_prop])
+
+            if user not in users:
+                Writer.Help.write_metadata(nix_stored.metadata, {record_prop: json.dumps(users + [user])})
+
+            return digest
+
+        @staticmethod
+        def write_pyramid(nix_block, nix_array, signal, factors):
+            """
+            Stores a min/max envelope of the signal for every decimation factor
+            as '<name>__pyramid<factor>' side arrays of shape (n_bins, 2, ...).
+            """
+            data = signal.magnitude
+
+            for factor in factors:
+                name = side_array_name(nix_array.name, 'pyramid' + str(factor))
+
+                try:
+                    nix_block.data_arrays[name]
+                    continue  # names are content hashes, so the level is up to date
+                except KeyError:
+                    pass
+
+                if len(data) <= factor:
+                    continue
+
+                starts = np.arange(0, len(data), factor)
+                level = np.stack([np.minimum.reduceat(data, starts), np.maximum.reduceat(data, starts)], axis=1)
+
+                args = (name, 'analogsignal_pyramid', level.dtype)
+                nix_level = nix_block.create_data_array(*args, data=level)
+
+                nix_level.append_sampled_dimension((factor * signal.sampling_period).item())
+                nix_level.dimensions[0].unit = signal.sampling_period.units.dimensionality.string
+                nix_level.append_set_dimension()
+                nix_level.dimensions[1].labels = ('min', 'max')
+
     @staticmethod
-    def write_block(nix_file, block, recursive=True):
+    def write_index(nix_file, entries):
+        """ Saves an index (see Reader.read_index) in a root section of the file """
+        Writer.drop_index(nix_file)
+
+        nix_section = nix_file.create_section(index_section, index_section)
+        record = json.dumps(entries, default=Writer.Help.encode_value)
+        Writer.Help.write_metadata(nix_section, {record_prop: record})
+
+    @staticmethod
+    def drop_index(nix_file):
+        """ Removes a saved index, which is outdated after any write """
+        try:
+            del nix_file.sections[index_section]
+        except KeyError:
+            pass
+
+    @staticmethod
+    def sweep_store(nix_file):
+        """
+        Drops users of stored arrays which were deleted or rewritten since,
+        and stored arrays with no users left.
+        """
+        try:
+            nix_store = nix_file.blocks[store_block]
+        except KeyError:
+            return
+
+        def is_user(user, digest):
+            block_name, array_name = user.rsplit('/', 1)
+            try:
+                nix_da = nix_file.blocks[block_name].data_arrays[array_name]
+            except KeyError:
+                return False
+            return nix_da.definition == store_prefix + digest
+
+        for digest in [x.name for x in nix_store.data_arrays]:
+            nix_section = nix_store.data_arrays[digest].metadata
+            users = json.loads(nix_section[record_prop])
+            live = [x for x in users if is_user(x, digest)]
+
+            if not live:
+                del nix_store.data_arrays[digest]
+                del nix_store.metadata.sections[digest]
+            elif len(live) < len(users):
+                Writer.Help.write_metadata(nix_section, {record_prop: json.dumps(live)})
+
+    @staticmethod
+    def write_block(nix_file, block, recursive=True, **options):
+        Writer.drop_index(nix_file)
+
+        if options.get('shared'):
+            options['store'] = Writer.Help.get_store(nix_file)
+
+        options.setdefault('nix_names', {})  # data hashed once per write, see Help.get_nix_name
+
         try:
             nix_block = nix_file.blocks[block.name]
         except KeyError:
             nix_block = nix_file.create_block(block.name, 'block')
 
         nix_block.metadata = Writer.Help.get_or_create_section(nix_file, 'block', block.name)
-        Writer.Help.write_metadata(nix_block.metadata, Writer.Help.extract_metadata(block))
+        Writer.Help.write_metadata(nix_block.metadata, Writer.Help.extract_metadata(block), options.get('compact'))
 
         if recursive:
-            Writer.Help.write_many(nix_block, nix_block, block.segments)
-            Writer.Help.write_many(nix_block, nix_block, block.recordingchannelgroups)
+            for attr_name in child_attrs['block']:
+                if not Writer.Help.is_clean_list(block, attr_name, nix_block, options['nix_names']):
+                    Writer.Help.write_many(nix_block, nix_block, getattr(block, attr_name), **options)
 
+            Reader.Help.set_state(block, nix_block, block.name, nix_names=options['nix_names'])
+
+        Writer.sweep_store(nix_file)
         return nix_block
 
     @staticmethod
-    def write_segment(nix_block, segment, recursive=True):
+    def write_segment(nix_block, segment, recursive=True, **options):
         try:
             nix_tag = nix_block.tags[segment.name]
         except KeyError:
             nix_tag = nix_block.create_tag(segment.name, 'segment', [0.0])
 
         nix_tag.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'segment', segment.name)
-        Writer.Help.write_metadata(nix_tag.metadata, Writer.Help.extract_metadata(segment))
+        Writer.Help.write_metadata(nix_tag.metadata, Writer.Help.extract_metadata(segment), options.get('compact'))
 
         if recursive:
-            Writer.Help.write_many(nix_block, nix_tag, segment.analogsignals)
-            Writer.Help.write_many(nix_block, nix_tag, segment.irregularlysampledsignals)
-            Writer.Help.write_many(nix_block, nix_tag, segment.spiketrains)
-            Writer.Help.write_many(nix_block, nix_tag, segment.events)
-            Writer.Help.write_many(nix_block, nix_tag, segment.epochs)
+            for attr_name in child_attrs['segment']:
+                if not Writer.Help.is_clean_list(segment, attr_name, nix_block, options.get('nix_names')):
+                    Writer.Help.write_many(nix_block, nix_tag, getattr(segment, attr_name), **options)
 
         Writer.Help.clean(nix_block)
         return nix_tag
 
     @staticmethod
-    def write_recordingchannelgroup(nix_block, rcg, recursive=True):
+    def append_segment(nix_block, segment, **options):
+        """
+        Writes a new Segment with its data objects. Unlike write_segment it
+        does not look at other Segments and data arrays of the Block, so the
+        time to append does not grow with the number of Segments.
+
+        Data objects are linked to their Units / RCGs if these are in the file.
+        """
+        try:
+            nix_block.tags[segment.name]
+        except KeyError:
+            pass
+        else:
+            raise ValueError("Segment %s already exists" % segment.name)
+
+        nix_tag = nix_block.create_tag(segment.name, 'segment', [0.0])
+
+        nix_tag.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'segment', segment.name)
+        Writer.Help.write_metadata(nix_tag.metadata, Writer.Help.extract_metadata(segment), options.get('compact'))
+
+        collections = (segment.analogsignals, segment.irregularlysampledsignals,
+                       segment.spiketrains, segment.events, segment.epochs)
+
+        options.setdefault('nix_names', {})
+
+        appended = set()
+        for neo_obj in [x for objs in collections for x in objs]:
+            write_func = getattr(Writer, 'write_' + Writer.Help.get_classname(neo_obj))
+            nix_array = write_func(nix_block, neo_obj, **options)
+
+            if nix_array.name not in appended:
+                nix_tag.references.append(nix_array)
+                appended.add(nix_array.name)
+
+            Writer.Help.link_sources(nix_block, neo_obj, nix_array)
+            Reader.Help.set_state(neo_obj, nix_block, nix_array.name, nix_names=options['nix_names'])
+
+        Reader.Help.set_state(segment, nix_block, segment.name, nix_names=options['nix_names'])
+
+        return nix_tag
+
+    @staticmethod
+    def make_live(nix_block, array_id):
+        """
+        Moves a data array named by the hash of its content to its live name
+        (see live_array_name), with its metadata, sources and Segment
+        references. Data are copied once, chunk by chunk.
+        """
+        nix_da = nix_block.data_arrays[array_id]
+
+        if nix_da.type not in ('analogsignal', 'spiketrain'):
+            raise ValueError("cannot append to %s of type %s" % (array_id, nix_da.type))
+        if (nix_da.definition or '').startswith(store_prefix):
+            raise ValueError("data of %s are shared and cannot be appended to" % array_id)
+
+        live_name = live_array_name(array_id)
+        live_da = Writer.copy_data_array(nix_block, nix_da, read_chunk_len, live_name)
+
+        # a new object with the same content would reuse a section named by the hash
+        live_da.metadata = Writer.Help.get_or_create_section(nix_block.metadata, nix_da.type, live_name)
+        for prop in nix_da.metadata.props:
+            live_da.metadata.create_property(prop.name, prop.values)
+
+        for source in nix_da.sources:
+            live_da.sources.append(source)
+
+        for nix_tag in nix_block.tags:
+            if array_id in [x.name for x in nix_tag.references]:
+                nix_tag.references.append(live_da)
+                del nix_tag.references[array_id]
+
+        side_names = [x.name for x in nix_block.data_arrays if x.type in side_array_types]
+        for name in side_names:
+            if name.rsplit('__', 1)[0] == array_id:
+                del nix_block.data_arrays[name]
+
+        obj_type = nix_da.type
+        del nix_block.data_arrays[array_id]
+        del nix_block.metadata.sections[obj_type + 's'].sections[array_id]
+
+        return live_da
+
+    @staticmethod
+    def append_data(nix_file, block_id, array_id, data):
+        """
+        Appends samples to an AnalogSignal or spike times to a SpikeTrain in
+        the file, e.g. while recording. On the first append the array is
+        moved to its live name (see make_live), as its content hash name
+        would not match the content any more. Side arrays (summaries,
+        pyramid), which would be outdated, are removed. t_stop of a
+        SpikeTrain is extended to the last spike if needed.
+        """
+        Writer.drop_index(nix_file)
+        nix_block = nix_file.blocks[block_id]
+
+        try:
+            nix_da = nix_block.data_arrays[live_array_name(array_id)]
+        except KeyError:
+            nix_da = Writer.make_live(nix_block, array_id)
+
+        if isinstance(data, pq.Quantity):
+            data = data.rescale(nix_da.unit).magnitude
+        data = np.asarray(data).reshape((-1,) + tuple(nix_da.data_extent[1:]))
+
+        if nix_da.polynom_coefficients:  # stored as integer codes
+            offset, gain = nix_da.polynom_coefficients
+            info = np.iinfo(nix_da.dtype)
+            data = np.clip(np.round((data - offset) / gain), info.min, info.max)
+
+        nix_da.append(data.astype(nix_da.dtype))
+
+        side_names = [x.name for x in nix_block.data_arrays if x.type in side_array_types]
+        for name in side_names:
+            if name.rsplit('__', 1)[0] == nix_da.name:
+                del nix_block.data_arrays[name]
+
+        if nix_da.type == 'spiketrain' and data.size:
+            metadata = Reader.Help.get_metadata(nix_da.metadata)
+            t_stop = Reader.Help.read_quantity(metadata, 't_stop')
+            last = pq.Quantity(data.max(), nix_da.unit)
+
+            if last > t_stop:
+                Writer.Help.update_metadata(nix_da.metadata, {'t_stop': last.rescale(t_stop.units)})
+
+        return nix_da
+
+    @staticmethod
+    def write_recordingchannelgroup(nix_block, rcg, recursive=True, **options):
         try:
             nix_source = nix_block.sources[rcg.name]
         except KeyError:
             nix_source = nix_block.create_source(rcg.name, 'recordingchannelgroup')
 
         nix_source.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'recordingchannelgroup', rcg.name)
-        Writer.Help.write_metadata(nix_source.metadata, Writer.Help.extract_metadata(rcg))
+        Writer.Help.write_metadata(nix_source.metadata, Writer.Help.extract_metadata(rcg), options.get('compact'))
 
         if recursive:
-            Writer.Help.write_many(nix_block, nix_source, rcg.units)
-            Writer.Help.write_many(nix_block, nix_source, rcg.analogsignals)
-            Writer.Help.write_many(nix_block, nix_source, rcg.irregularlysampledsignals)
+            for attr_name in child_attrs['recordingchannelgroup']:
+                if not Writer.Help.is_clean_list(rcg, attr_name, nix_block, options.get('nix_names')):
+                    Writer.Help.write_many(nix_block, nix_source, getattr(rcg, attr_name), **options)
 
         Writer.Help.clean(nix_block)
         return nix_source
 
     @staticmethod
-    def write_unit(nix_block, source_id, unit, recursive=True):
+    def write_unit(nix_block, source_id, unit, recursive=True, **options):
         nix_rcg_source = nix_block.sources[source_id]
 
         try:
@@ -647,17 +2195,19 @@ class Writer:
             nix_source = nix_rcg_source.create_source(unit.name, 'unit')
 
         nix_source.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'unit', unit.name)
-        Writer.Help.write_metadata(nix_source.metadata, Writer.Help.extract_metadata(unit))
+        Writer.Help.write_metadata(nix_source.metadata, Writer.Help.extract_metadata(unit), options.get('compact'))
 
         if recursive:
-            Writer.Help.write_many(nix_block, nix_source, unit.spiketrains)
+            if not Writer.Help.is_clean_list(unit, 'spiketrains', nix_block, options.get('nix_names')):
+                Writer.Help.write_many(nix_block, nix_source, unit.spiketrains, **options)
 
         Writer.Help.clean(nix_block)
         return nix_source
 
     @staticmethod
-    def write_analogsignal(nix_block, signal):
-        obj_name = Writer.Help.get_obj_nix_name(signal)
+    def write_analogsignal(nix_block, signal, **options):
+        Writer.Help.check_derived(signal)
+        obj_name = Writer.Help.get_nix_name(signal, options.get('nix_names'))
 
         try:
             nix_array = nix_block.data_arrays[obj_name]
@@ -665,9 +2215,8 @@ class Writer:
             # TODO update data?
 
         except KeyError:
-            args = (obj_name, 'analogsignal', signal.dtype, (0,1))
-            nix_array = nix_block.create_data_array(*args)
-            nix_array.append(signal)
+            args = (nix_block, obj_name, 'analogsignal', signal, options.get('storage_dtype'), options.get('store'))
+            nix_array = Writer.Help.create_signal_array(*args)
 
         nix_array.unit = signal.units.dimensionality.string
 
@@ -677,18 +2226,23 @@ class Writer:
 
         metadata = Writer.Help.extract_metadata(signal)
 
-        # special t_start serialization
-        metadata['t_start'] = signal.t_start.item()
-        metadata['t_start__unit'] = signal.t_start.units.dimensionality.string
+        metadata['t_start'] = signal.t_start
 
         nix_array.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'analogsignal', obj_name)
-        Writer.Help.write_metadata(nix_array.metadata, metadata)
+        Writer.Help.write_metadata(nix_array.metadata, metadata, options.get('compact'))
+
+        if options.get('summary_chunk'):
+            Writer.Help.write_summary(nix_block, nix_array, signal, options['summary_chunk'])
+
+        if options.get('pyramid'):
+            Writer.Help.write_pyramid(nix_block, nix_array, signal, options['pyramid'])
 
         return nix_array
 
     @staticmethod
-    def write_irregularlysampledsignal(nix_block, signal):
-        obj_name = Writer.Help.get_obj_nix_name(signal)
+    def write_irregularlysampledsignal(nix_block, signal, **options):
+        Writer.Help.check_derived(signal)
+        obj_name = Writer.Help.get_nix_name(signal, options.get('nix_names'))
 
         try:
             nix_array = nix_block.data_arrays[obj_name]
@@ -696,26 +2250,31 @@ class Writer:
             # TODO update data?
 
         except KeyError:
-            args = (obj_name, 'irregularlysampledsignal', signal.dtype, (0,1))
-            nix_array = nix_block.create_data_array(*args)
-            nix_array.append(signal)
+            args = (nix_block, obj_name, 'irregularlysampledsignal', signal, options.get('storage_dtype'), options.get('store'))
+            nix_array = Writer.Help.create_signal_array(*args)
 
         nix_array.unit = signal.units.dimensionality.string
 
         if not nix_array.dimensions:
-            nix_array.append_range_dimension(np.array(signal.times))  # fix in NIX?
-        nix_array.dimensions[0].unit = signal.times.units.dimensionality.string
+            if options.get('times_array'):
+                nix_array.append_set_dimension()  # times are in a side array
+                Writer.Help.write_times(nix_block, nix_array, signal.times)
+            else:
+                nix_array.append_range_dimension(np.array(signal.times))  # fix in NIX?
+
+        if isinstance(nix_array.dimensions[0], nix.RangeDimension):
+            nix_array.dimensions[0].unit = signal.times.units.dimensionality.string
 
         metadata = Writer.Help.extract_metadata(signal)
 
         nix_array.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'irregularlysampledsignal', obj_name)
-        Writer.Help.write_metadata(nix_array.metadata, metadata)
+        Writer.Help.write_metadata(nix_array.metadata, metadata, options.get('compact'))
 
         return nix_array
 
     @staticmethod
-    def write_spiketrain(nix_block, st):
-        obj_name = Writer.Help.get_obj_nix_name(st)
+    def write_spiketrain(nix_block, st, **options):
+        obj_name = Writer.Help.get_nix_name(st, options.get('nix_names'))
 
         try:
             nix_array = nix_block.data_arrays[obj_name]
@@ -733,25 +2292,22 @@ class Writer:
 
         metadata = Writer.Help.extract_metadata(st)
 
-        metadata['t_start'] = st.t_start.item()
-        metadata['t_start__unit'] = st.t_start.units.dimensionality.string
-        metadata['t_stop'] = st.t_stop.item()
-        metadata['t_stop__unit'] = st.t_stop.units.dimensionality.string
+        metadata['t_start'] = st.t_start
+        metadata['t_stop'] = st.t_stop
 
         if st.left_sweep:
-            metadata['left_sweep'] = st.left_sweep.item()
-            metadata['left_sweep__unit'] = st.left_sweep.units.dimensionality.string
+            metadata['left_sweep'] = st.left_sweep
 
         # FIXME waveforms?
 
         nix_array.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'spiketrain', obj_name)
-        Writer.Help.write_metadata(nix_array.metadata, metadata)
+        Writer.Help.write_metadata(nix_array.metadata, metadata, options.get('compact'))
 
         return nix_array
 
     @staticmethod
-    def write_event(nix_block, event):
-        obj_name = Writer.Help.get_obj_nix_name(event)
+    def write_event(nix_block, event, **options):
+        obj_name = Writer.Help.get_nix_name(event, options.get('nix_names'))
 
         try:
             nix_array = nix_block.data_arrays[obj_name]
@@ -767,13 +2323,13 @@ class Writer:
         metadata = Writer.Help.extract_metadata(event)
 
         nix_array.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'event', obj_name)
-        Writer.Help.write_metadata(nix_array.metadata, metadata)
+        Writer.Help.write_metadata(nix_array.metadata, metadata, options.get('compact'))
 
         return nix_array
 
     @staticmethod
-    def write_epoch(nix_block, epoch):
-        obj_name = Writer.Help.get_obj_nix_name(epoch)
+    def write_epoch(nix_block, epoch, **options):
+        obj_name = Writer.Help.get_nix_name(epoch, options.get('nix_names'))
 
         try:
             nix_array = nix_block.data_arrays[obj_name]
@@ -789,51 +2345,559 @@ class Writer:
         metadata = Writer.Help.extract_metadata(epoch)
 
         nix_array.metadata = Writer.Help.get_or_create_section(nix_block.metadata, 'epoch', obj_name)
-        Writer.Help.write_metadata(nix_array.metadata, metadata)
+        Writer.Help.write_metadata(nix_array.metadata, metadata, options.get('compact'))
 
         return nix_array
 
+    @staticmethod
+    def copy_section(parent, nix_section, keep=None):
+        """
+        Copies a section with its properties and subsections under parent
+        (a file or a section). Subsections for which keep(section) is False
+        are skipped.
+        """
+        new_section = parent.create_section(nix_section.name, nix_section.type)
+
+        for prop in nix_section.props:
+            new_section.create_property(prop.name, prop.values)
+
+        for sub in nix_section.sections:
+            if keep is None or keep(sub):
+                Writer.copy_section(new_section, sub, keep)
+
+        return new_section
+
+    @staticmethod
+    def copy_data_array(nix_block, nix_da, chunk_len, name=None):
+        """
+        Copies a data array with its dimensions, chunk_len rows at a time.
+
+        :param name:    name of the copy, by default the name of the array
+        """
+        shape = tuple(nix_da.data_extent)
+        args = (name or nix_da.name, nix_da.type, nix_da.dtype, (0,) + shape[1:])
+        new_da = nix_block.create_data_array(*args)
+
+        for i in range(0, shape[0], chunk_len):
+            new_da.append(Reader.Help.read_codes(nix_da, slice(i, min(i + chunk_len, shape[0]))))
+
+        new_da.unit = nix_da.unit
+        new_da.label = nix_da.label
+        new_da.definition = nix_da.definition
+        if nix_da.polynom_coefficients:
+            new_da.polynom_coefficients = nix_da.polynom_coefficients
+
+        for dim in nix_da.dimensions:
+            if isinstance(dim, nix.SampledDimension):
+                new_dim = new_da.append_sampled_dimension(dim.sampling_interval)
+                new_dim.offset = dim.offset
+            elif isinstance(dim, nix.RangeDimension):
+                new_dim = new_da.append_range_dimension(dim.ticks)
+            else:
+                new_dim = new_da.append_set_dimension()
+                new_dim.labels = dim.labels
+                continue
+
+            new_dim.unit = dim.unit
+            new_dim.label = dim.label
+
+        return new_da
 
-class NixIO(BaseIO):
+    @staticmethod
+    def copy_file(nix_src, nix_dst, chunk_len):
+        """
+        Copies all live objects of a file into another one: Blocks with their
+        tags, sources and data arrays, and only the metadata sections still
+        used by them. Data are copied in chunks, so memory use is bounded.
+
+        :param chunk_len:   function giving the number of rows to copy at
+                            once for a data array (see FileHandler.chunk_len)
+        """
+        def iter_sources(parent, path=''):
+            """ yields (path, source), Unit names are unique per RCG only """
+            for source in parent.sources:
+                source_path = path + source.name
+                yield source_path, source
+                for sub in iter_sources(source, source_path + '/'):
+                    yield sub
+
+        def copy_sources(old_parent, new_parent):
+            for source in old_parent.sources:
+                copy_sources(source, new_parent.create_source(source.name, source.type))
+
+        def used_sections(nix_block):
+            objects = [nix_block] + list(nix_block.tags) + list(nix_block.data_arrays)
+            objects += [x for _, x in iter_sources(nix_block)]
+            return set([(x.metadata.type, x.metadata.name) for x in objects if x.metadata is not None])
+
+        blocks = dict([(x.name, x) for x in nix_src.blocks])
+        for nix_section in nix_src.sections:
+            if nix_section.type != 'block':
+                Writer.copy_section(nix_dst, nix_section)
+            elif nix_section.name in blocks:  # skip metadata of deleted Blocks
+                used = used_sections(blocks[nix_section.name])
+                keep = lambda x: x.name == x.type + 's' or (x.type, x.name) in used
+                Writer.copy_section(nix_dst, nix_section, keep)
+
+        for old_block in nix_src.blocks:
+            new_block = nix_dst.create_block(old_block.name, old_block.type)
+
+            copy_sources(old_block, new_block)
+            sources = dict(iter_sources(new_block))
+            paths = dict([(x.id, path) for path, x in iter_sources(old_block)])
+
+            for nix_da in old_block.data_arrays:
+                new_da = Writer.copy_data_array(new_block, nix_da, chunk_len(nix_da))
+                for source in nix_da.sources:
+                    new_da.sources.append(sources[paths[source.id]])
+
+            for tag in old_block.tags:
+                new_tag = new_block.create_tag(tag.name, tag.type, tag.position)
+                if tag.extent:
+                    new_tag.extent = tag.extent
+                for nix_da in tag.references:
+                    new_tag.references.append(new_block.data_arrays[nix_da.name])
+
+            # link metadata
+            sections = {}
+            try:
+                block_section = nix_dst.sections[old_block.name]
+            except KeyError:
+                block_section = None
+            else:
+                for sub in block_section.sections:
+                    sections[(sub.type, sub.name)] = sub
+                    sections.update([((x.type, x.name), x) for x in sub.sections])
+
+            if old_block.metadata is not None and block_section is not None:
+                new_block.metadata = block_section
+
+            pairs = [(new_block.tags[x.name], x) for x in old_block.tags]
+            pairs += [(new_block.data_arrays[x.name], x) for x in old_block.data_arrays]
+            pairs += [(sources[path], x) for path, x in iter_sources(old_block)]
+
+            for new_obj, old_obj in pairs:
+                if old_obj.metadata is not None:
+                    key = (old_obj.metadata.type, old_obj.metadata.name)
+                    if key in sections:
+                        new_obj.metadata = sections[key]
+
+
+def list_contents(filename):
     """
-    This I/O can read/write Neo objects into HDF5 format using NIX library.
+    Lists Blocks and their Segments in a file without importing Neo.
+
+    :return:    dict {block name: [segment names]}
     """
+    fh = FileHandler(filename, readonly=True)
+    fh.open()
+
+    try:
+        blocks = [x for x in fh.handle.blocks if x.type == 'block']
+        return dict([(b.name, [x.name for x in b.tags if x.type == 'segment']) for b in blocks])
+    finally:
+        fh.close()
+
+
+def __getattr__(name):
+    """
+    NixIO derives from Neo BaseIO, so it is created on first access to keep
+    importing this module cheap (see BaseNixIO).
+    """
+    if name == 'NixIO':
+        global NixIO
+        NixIO = _create_nixio()
+        return NixIO
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def _create_nixio():
+    from neo.core import objectlist
+    from neo.io.baseio import BaseIO
+
+    class NixIO(BaseNixIO, BaseIO):
+        __doc__ = BaseNixIO.__doc__
+
+        is_readable = True
+        is_writable = True
+
+        supported_objects = objectlist
+        readable_objects = objectlist
+        writeable_objects = objectlist
+
+        read_params = dict(zip(objectlist, [] * len(objectlist)))
+        write_params = dict(zip(objectlist, [] * len(objectlist)))
+
+        name = 'Nix IO'
+        extensions = ['h5']
+        mode = 'file'
 
-    is_readable = True
-    is_writable = True
+    NixIO.__module__ = __name__
+    return NixIO
 
-    supported_objects = objectlist
-    readable_objects = objectlist
-    writeable_objects = objectlist
 
-    read_params = dict(zip(objectlist, [] * len(objectlist)))
-    write_params = dict(zip(objectlist, [] * len(objectlist)))
+class BaseNixIO(object):
+    """
+    This I/O can read/write Neo objects into HDF5 format using NIX library.
 
-    name = 'Nix IO'
-    extensions = ['h5']
-    mode = 'file'
+    The I/O methods of NixIO. NixIO itself is this class combined with Neo
+    BaseIO and is available as neo2nix.nixio.NixIO.
+    """
 
-    def __init__(self, filename, readonly=False):
+    def __init__(self, filename, readonly=False, read_window=None):
         """
         Initialize new IO instance.
 
         If the file does not exist, it will be created.
-        This I/O works in a detached mode.
+        This I/O works in a detached mode, except within a session().
 
-        :param filename: full path to the file (like '/tmp/foo.h5')
+        :param filename:        full path to the file (like '/tmp/foo.h5')
+        :param read_window:     bytes to read at once when streaming data,
+                                see FileHandler
         """
-        BaseIO.__init__(self, filename=filename)
-        self.f = FileHandler(filename)
+        super(BaseNixIO, self).__init__(filename=filename)
+        self.f = FileHandler(filename, readonly, read_window=read_window)
         self.readonly = readonly
+        self._executor = None  # single I/O thread for the asyncio interface
+        self._index = None  # see find
+
+    @contextlib.contextmanager
+    def session(self):
+        """
+        Keeps the file open for all I/O calls in a with-block, so that it is
+        opened and flushed once instead of on every call. Use flush() to
+        write changes to disk within a session.
+        """
+        self.f.open()
+        try:
+            yield self
+        finally:
+            self.f.close()
+
+    def flush(self):
+        """ Writes buffered changes to disk, if the file is open """
+        if self.f.is_open:
+            self.f.flush()
+
+    @file_transaction
+    def list_blocks(self):
+        return [x.name for x in self.f.handle.blocks if x.type == 'block']
+
+    def read_all_blocks(self, **options):
+        return list(self.iter_blocks(**options))
+
+    def iter_blocks(self, names=None, where=None, **options):
+        """
+        Yields Blocks one at a time. The file stays open until the iteration
+        ends, and Blocks are not kept, so every Block can be dropped after use.
+
+        Blocks are filtered before they are read.
+
+        :param names:   names of the Blocks to read
+        :param where:   dict to match Block attributes and annotations, see
+                        find
+        """
+        def matches(nix_block):
+            if names is not None and nix_block.name not in names:
+                return False
+            if not where:
+                return True
+
+            metadata = Reader.Help.get_metadata(nix_block.metadata)
+            values = Reader.Help.read_attributes(metadata, 'block')
+            values.update(Reader.Help.read_annotations(metadata, 'block'))
+
+            return Reader.Help.match(values, where)
+
+        self.f.open()
+        try:
+            with self.f.lock:
+                blocks = [x for x in self.f.handle.blocks if x.type == 'block']
+                block_ids = [x.name for x in blocks if matches(x)]
+
+            for block_id in block_ids:
+                with self.f.lock:
+                    block = Reader.read_block(self.f, block_id, **options)
+                yield block
+        finally:
+            self.f.close()
+
+    @file_transaction
+    def read_block(self, block_id, **options):
+        """
+        Reads a Block with lazy loaded children. Options are passed to the
+        readers of all children, see Reader.read_analogsignal.
+        """
+        return Reader.read_block(self.f, block_id, **options)
+
+    @file_transaction
+    def list_segments(self, block_id):
+        return [x.name for x in self.f.handle.blocks[block_id].tags if x.type == 'segment']
+
+    @file_transaction
+    def read_segment(self, block_id, segment_id, **options):
+        return Reader.read_segment(self.f, block_id, segment_id, **options)
+
+    @file_transaction
+    def read_analogsignal(self, block_id, array_id, **options):
+        """
+        Reads a single AnalogSignal, see Reader.read_analogsignal for options.
+        """
+        return Reader.read_analogsignal(self.f, block_id, array_id, **options)
+
+    @file_transaction
+    def read_object(self, block_id, obj_type, nix_name, parent=None, **options):
+        """
+        Reads any object by its type and NIX name.
+
+        :param parent:  name of the RCG, required for Units only
+        """
+        if obj_type == 'block':
+            return Reader.read_block(self.f, nix_name, **options)
+        if obj_type == 'recordingchannelgroup':
+            return Reader.read_RCG(self.f, block_id, nix_name, **options)
+        if obj_type == 'unit':
+            return Reader.read_unit(self.f, block_id, parent, nix_name, **options)
+
+        return getattr(Reader, 'read_' + obj_type)(self.f, block_id, nix_name, **options)
+
+    @file_transaction
+    def build_index(self, save=False):
+        """
+        Indexes metadata of all objects in the file for find. A saved index
+        is used if there is one; writes through NixIO remove it.
+
+        :param save:    store the index in the file for later sessions
+        """
+        entries = None if save else Reader.read_saved_index(self.f.handle)
+
+        if entries is None:
+            entries = Reader.read_index(self.f.handle)
+
+        if save:
+            Writer.write_index(self.f.handle, entries)
+
+        self._index = entries
+        return entries
+
+    def find(self, type=None, where=None, block=None):
+        """
+        Finds objects by their attributes and annotations, like
+
+            io.find(type='spiketrain', where={'cell_type': 'PV'})
+
+        without reading any data.
+
+        :param type:    object type, like 'segment' or 'spiketrain'
+        :param where:   dict {key: value}; a value can also be a function
+                        which returns True for matching values
+        :param block:   name of a Block to search in
+        :return:        list of Handles, to read the objects with load()
+        """
+        def matches(entry):
+            if type is not None and not entry['type'] == type:
+                return False
+            if block is not None and not entry['block'] == block:
+                return False
+
+            return Reader.Help.match(dict(entry['attributes'], **entry['annotations']), where)
+
+        if self._index is None:
+            self.build_index()
+
+        return [Handle(self, x) for x in self._index if matches(x)]
+
+    def iter_analogsignal_chunks(self, block_id, array_id, chunk_duration, overlap=None):
+        """
+        Streams an AnalogSignal in pieces of chunk_duration, optionally
+        overlapping, with only one piece in memory at a time (see
+        Reader.iter_analogsignal_chunks). The file stays open until the
+        iteration ends.
+        """
+        self.f.open()
+        try:
+            chunks = Reader.iter_analogsignal_chunks(self.f, block_id, array_id, chunk_duration, overlap)
+            while True:
+                with self.f.lock:  # read a chunk, but do not hold the lock while it is used
+                    signal = next(chunks, None)
+                if signal is None:
+                    break
+                yield signal
+        finally:
+            self.f.close()
+
+    @file_transaction
+    def append_segment(self, block_id, segment, **options):
+        """
+        Appends a new Segment to a Block in the file, writing only the Segment
+        and its data objects (see Writer.append_segment). Options are the same
+        as for write_block.
+        """
+        self._index = None
+        Writer.drop_index(self.f.handle)
+
+        if options.get('shared'):
+            options['store'] = Writer.Help.get_store(self.f.handle)
+
+        Writer.append_segment(self.f.handle.blocks[block_id], segment, **options)
+
+    @file_transaction
+    def read_spike_counts(self, block_id, bin_size, t_start=None, t_stop=None, segment_id=None):
+        """
+        Binned spike count matrix (units x bins) of a Block or a Segment,
+        computed from the stored spike times without reading any Neo objects
+        (see Reader.read_spike_counts).
+        """
+        return Reader.read_spike_counts(self.f, block_id, bin_size, t_start, t_stop, segment_id)
+
+    def release(self, neo_obj):
+        """
+        Frees the memory of the loaded children of an object (a Block,
+        Segment, RCG or Unit) and of their children, see ProxyList.evict.
+        They are read again from the file on next access.
+        """
+        return Reader.Help.release(neo_obj)
+
+    def repack(self):
+        """
+        Reclaims the space of deleted and rewritten objects, which HDF5 does
+        not free, by copying all live objects into a new file (chunk by
+        chunk, see FileHandler.chunk_len) and replacing the file with it.
+
+        Cannot be called within a session() or on a readonly file.
+        """
+        if self.readonly:
+            raise IOError("%s is opened readonly and cannot be repacked" % self.f.filename)
+        if self.f.is_open:
+            raise RuntimeError("the file cannot be repacked while it is open")
+
+        tmp_name = self.f.filename + '.repack'
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+        target = FileHandler(tmp_name)
+        self.f.open()
+        try:
+            target.open()
+            try:
+                with self.f.lock:
+                    Writer.copy_file(self.f.handle, target.handle, self.f.chunk_len)
+                    Writer.sweep_store(target.handle)  # e.g. users deleted outside NixIO
+            finally:
+                target.close()
+        except Exception:
+            os.remove(tmp_name)
+            raise
+        finally:
+            self.f.close()
+
+        os.replace(tmp_name, self.f.filename)
+        self._index = None
 
     @file_transaction
-    def read_all_blocks(self):
-        return [Reader.read_block(self.f, blk.name) for blk in self.f.handle.blocks]
+    def read_segment_stats(self, block_id, segment_id):
+        """ Partial statistics of a Segment, see Reader.read_segment_stats """
+        return Reader.read_segment_stats(self.f, block_id, segment_id)
+
+    def read_statistics(self, block_id, segments=None, processes=None):
+        """
+        Per channel mean, variance and RMS of the signals, firing rates of the
+        Units and event counts per label of a Block, streamed from the file
+        and computed for several Segments in parallel (see neo2nix.stats).
+        """
+        from neo2nix import stats
+
+        return stats.compute(self.f.filename, block_id, segments, processes)
 
     @file_transaction
-    def read_block(self, block_id):
-        return Reader.read_block(self.f, block_id)
+    def read_summaries(self, block_id, segment_id=None):
+        """
+        Reads per-chunk summaries (min, max, mean, RMS) of the AnalogSignals
+        of a Block or a Segment, without reading the signals themselves.
+        """
+        return Reader.read_summaries(self.f, block_id, segment_id)
 
     @file_transaction
-    def write_block(self, block, recursive=True):
-        nix_block = Writer.write_block(self.f.handle, block, recursive=recursive)
+    def write_block(self, block, recursive=True, **options):
+        """
+        Writes a Block to the file.
+
+        Supported options:
+
+        :param summary_chunk:   store min/max/mean/RMS for every chunk of
+                                this many samples of each AnalogSignal
+        :param pyramid:         decimation factors, like (10, 100, 1000), to
+                                store min/max envelopes of AnalogSignals for
+                                reading with max_points
+        :param storage_dtype:   dtype to store new signals with, like
+                                'float32' or 'int16'; integer codes are stored
+                                with gain and offset and scaled back on read
+        :param compact:         store the metadata of every object as a single
+                                record instead of a property per value
+        :param shared:          keep the data of new signals in a file-level
+                                store, once for all Blocks with equal data
+        :param times_array:     store times of new IrregularlySampledSignals as
+                                a data array of their own, to read time windows
+                                without reading all times (see
+                                Reader.read_irregularlysampledsignal)
+        """
+        self._index = None
+        nix_block = Writer.write_block(self.f.handle, block, recursive=recursive, **options)
+
+    # -------------------------------------------
+    # asyncio interface
+    # -------------------------------------------
+
+    def _run_async(self, method, *args, **kwargs):
+        """
+        Runs an I/O method in the executor of this instance. It has a single
+        thread, so calls from concurrent tasks access the file one at a time.
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def read_block_async(self, block_id, **options):
+        """
+        Reads a Block with all its children loaded in the I/O thread, so that
+        using the Block does not access the file from the event loop.
+        """
+        def read():
+            with self.session():
+                return Reader.Help.load(self.read_block(block_id, **options), recursive=True)
+
+        return await self._run_async(read)
+
+    async def read_segment_async(self, block_id, segment_id, **options):
+        """ Reads a Segment with all its data objects loaded """
+        def read():
+            return Reader.Help.load(self.read_segment(block_id, segment_id, **options))
+
+        return await self._run_async(read)
+
+    async def iter_segments_async(self, block_id, **options):
+        """
+        Asynchronous iterator over the Segments of a Block. Data objects of
+        every Segment are loaded in the I/O thread, before it is yielded.
+        """
+        for segment_id in await self._run_async(self.list_segments, block_id):
+            yield await self.read_segment_async(block_id, segment_id, **options)
+
+    async def write_block_async(self, block, recursive=True, **options):
+        return await self._run_async(self.write_block, block, recursive=recursive, **options)
+
+    async def append_segment_async(self, block_id, segment, **options):
+        """ Appends a Segment, e.g. for streaming writes of one trial at a time """
+        return await self._run_async(self.append_segment, block_id, segment, **options)
+
+    def close(self):
+        """ Stops the I/O thread of the asyncio interface, if it was started """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,250 @@
+import json
+import os
+import zlib
+from collections import OrderedDict
+
+from neo2nix.nixio import NixIO, ProxyList, Writer, file_transaction, child_attrs
+
+
+unsegmented_shard = 0  # shard of the data objects which are in no Segment
+
+
+class ShardedList(ProxyList):
+    """
+    A ProxyList joining collections of the same object from several shards.
+    The collections are fetched only when the list is accessed.
+    """
+
+    def __init__(self, fetch_func):
+        """
+        :param fetch_func:  function without arguments returning the members
+        """
+        ProxyList.__init__(self, None, fetch_func)
+
+    @property
+    def _data(self):
+        if self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    cache = self._fetch_func()
+                    self._loaded = list(cache)
+                    self._cache = cache
+
+        return self._cache
+
+
+class ShardedNixIO(object):
+    """
+    Stores Blocks across several NIX files (shards), tied together by a
+    small JSON manifest.
+
+    Every shard has a copy of the Block with the Segments assigned to it
+    (by a hash of the Segment name) and the RCGs / Units linked only to the
+    data objects of these Segments. Data objects of RCGs / Units which are
+    in no Segment are stored in the first shard. Readers merge the shards
+    into a single logical Block.
+
+    Shards are independent files, so separate processes can fill different
+    shards at the same time (see write_shard and append_segment).
+    """
+
+    def __init__(self, filename, shards=None, readonly=False):
+        """
+        :param filename:    path to the manifest (like '/tmp/foo.json'); shard
+                            files are stored next to it
+        :param shards:      number of shards for a new manifest
+        """
+        self.filename = filename
+        self.readonly = readonly
+
+        if os.path.exists(filename):
+            with open(filename) as f:
+                manifest = json.load(f)
+
+            if shards is not None and not shards == len(manifest['shards']):
+                raise ValueError("%s has %d shards" % (filename, len(manifest['shards'])))
+
+        elif shards:
+            base = os.path.splitext(os.path.basename(filename))[0]
+            manifest = {
+                'format': 'neo2nix-shards',
+                'version': 1,
+                'shards': ['%s.%03d.h5' % (base, i) for i in range(shards)]
+            }
+            self._save_manifest(manifest)
+
+        else:
+            raise ValueError("number of shards is required for a new file")
+
+        folder = os.path.dirname(os.path.abspath(filename))
+        paths = [os.path.join(folder, x) for x in manifest['shards']]
+
+        self.manifest = manifest
+        self.shards = [NixIO(x, readonly=readonly) for x in paths]
+
+    def _save_manifest(self, manifest):
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(tmp, self.filename)  # readers never see a partial manifest
+
+    def shard_of(self, segment_name):
+        """ Index of the shard storing a Segment """
+        return zlib.crc32(segment_name.encode('UTF-8')) % len(self.shards)
+
+    # -------------------------------------------
+    # writing
+    # -------------------------------------------
+
+    def write_block(self, block, recursive=True, **options):
+        options.setdefault('nix_names', {})  # data hashed once for all shards
+        for i in range(len(self.shards)):
+            self.write_shard(block, i, recursive=recursive, **options)
+
+    def write_shard(self, block, shard, recursive=True, **options):
+        """
+        Writes the part of a Block stored in one shard. Safe to run for
+        different shards in parallel processes.
+        """
+        io = self.shards[shard]
+        _write_shard(io, block, shard, self.shard_of, recursive, options)
+
+    def append_segment(self, block_id, segment, **options):
+        """
+        Appends a new Segment to its shard (see NixIO.append_segment),
+        creating the Block in the shard if needed.
+        """
+        io = self.shards[self.shard_of(segment.name)]
+
+        if block_id not in io.list_blocks():
+            from neo.core import Block
+            io.write_block(Block(name=block_id), recursive=False)
+
+        io.append_segment(block_id, segment, **options)
+
+    # -------------------------------------------
+    # reading
+    # -------------------------------------------
+
+    def list_blocks(self):
+        names = OrderedDict()
+        for io in self.shards:
+            if os.path.exists(io.filename):
+                names.update([(x, None) for x in io.list_blocks()])
+
+        return list(names.keys())
+
+    def read_all_blocks(self, **options):
+        return [self.read_block(x, **options) for x in self.list_blocks()]
+
+    def read_block(self, block_id, **options):
+        """
+        Reads a Block merged from all shards. Attributes are taken from the
+        first shard with the Block, children are loaded lazily from all of them.
+        """
+        shards = [x for x in self.shards if os.path.exists(x.filename)]
+        blocks = [io.read_block(block_id, **options) for io in shards if block_id in io.list_blocks()]
+        if not blocks:
+            raise KeyError(block_id)
+
+        block = blocks[0]
+        for attr_name in child_attrs['block']:
+            lists = [getattr(x, attr_name) for x in blocks]
+            setattr(block, attr_name, ShardedList(ShardedNixIO._get_merge_func(lists)))
+
+        return block
+
+    @staticmethod
+    def _get_merge_func(lists):
+        return lambda: ShardedNixIO._merge(lists)
+
+    @staticmethod
+    def _merge(lists):
+        """
+        Joins collections from several shards. Containers (Segments, RCGs,
+        Units) with the same name are merged into one, data objects are
+        concatenated.
+        """
+        groups = OrderedDict()
+        for obj in [x for objs in lists for x in objs]:
+            obj_type = obj.__class__.__name__.lower()
+            if obj_type not in child_attrs:
+                groups[id(obj)] = [obj]
+            else:
+                groups.setdefault((obj_type, obj.name), []).append(obj)
+
+        result = []
+        for group in groups.values():
+            obj = group[0]
+
+            if len(group) > 1:
+                for attr_name in child_attrs[obj.__class__.__name__.lower()]:
+                    children = [getattr(x, attr_name) for x in group]
+                    setattr(obj, attr_name, ShardedList(ShardedNixIO._get_merge_func(children)))
+
+            result.append(obj)
+
+        return result
+
+
+@file_transaction
+def _write_shard(io, block, shard, shard_of, recursive, options):
+    options = dict(options)  # the store is per shard file
+    if options.get('shared'):
+        options['store'] = Writer.Help.get_store(io.f.handle)
+    options.setdefault('nix_names', {})
+
+    nix_block = Writer.write_block(io.f.handle, block, recursive=False, **options)
+    if not recursive:
+        return
+
+    def write_many(parent, objs, obj_type, **kwargs):
+        """ Writer.Help.write_many, which leaves stale objects if there are none to write """
+        if objs:
+            Writer.Help.write_many(nix_block, parent, objs, **kwargs)
+        elif obj_type == 'segment':
+            for name in [x.name for x in nix_block.tags if x.type == obj_type]:
+                del nix_block.tags[name]
+        elif obj_type in ('recordingchannelgroup', 'unit'):
+            for name in [x.name for x in parent.sources if x.type == obj_type]:
+                del parent.sources[name]
+        else:
+            for nix_da in [x for x in nix_block.data_arrays if x.type == obj_type and parent in x.sources]:
+                del nix_da.sources[parent.name]
+
+    segments = [x for x in block.segments if shard_of(x.name) == shard]
+    write_many(nix_block, segments, 'segment', **options)
+
+    # RCGs and Units are in every shard, linked to the data of the shard only.
+    # Data are matched by content, as Blocks read from shards have separate
+    # objects in Segments and in RCGs / Units.
+    def data_names(segments):
+        return set([Writer.Help.get_nix_name(x, options['nix_names']) for seg in segments
+                    for attr_name in child_attrs['segment'] for x in getattr(seg, attr_name)])
+
+    in_segments = data_names(block.segments)
+    in_this = data_names(segments)
+
+    def in_shard(objs):
+        names = [Writer.Help.get_nix_name(x, options['nix_names']) for x in objs]
+        if shard == unsegmented_shard:
+            return [x for x, name in zip(objs, names) if name in in_this or name not in in_segments]
+        return [x for x, name in zip(objs, names) if name in in_this]
+
+    containers = dict(options, recursive=False)
+
+    write_many(nix_block, block.recordingchannelgroups, 'recordingchannelgroup', **containers)
+    for rcg in block.recordingchannelgroups:
+        nix_source = nix_block.sources[rcg.name]
+
+        write_many(nix_source, rcg.units, 'unit', **containers)
+        for unit in rcg.units:
+            nix_unit = nix_source.sources[unit.name]
+            write_many(nix_unit, in_shard(unit.spiketrains), 'spiketrain', **options)
+
+        write_many(nix_source, in_shard(rcg.analogsignals), 'analogsignal', **options)
+        write_many(nix_source, in_shard(rcg.irregularlysampledsignals), 'irregularlysampledsignal', **options)
+
+    Writer.Help.clean(nix_block)
+    Writer.sweep_store(io.f.handle)
@@ -0,0 +1,116 @@
+"""
+Neo data objects backed by shared memory (see the Reader 'shared_memory'
+option). They are pickled as references to the shared memory block, so
+worker processes of a pool use the same buffer instead of a copy.
+
+Blocks are created by a multiprocessing.managers.SharedMemoryManager,
+which frees them on shutdown:
+
+    with SharedMemoryManager() as smm:
+        block = io.read_block(name, shared_memory=smm)
+        pool.map(analyse, block.segments[0].analogsignals)
+
+The manager owns the blocks: they live until it shuts down, and objects
+using them must not be used after that, in any process. Processes which
+unpickle such objects only map the blocks (see get_memory). They do not
+register them with their resource tracker, so exiting never frees a
+block still used by others.
+"""
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+_classes = {}  # Neo class: its subclass pickled by reference
+_attached = {}  # name: SharedMemory block mapped in this process
+
+
+def get_memory(name):
+    """ Maps a shared memory block into this process, once, without owning it """
+    try:
+        return _attached[name]
+    except KeyError:
+        pass
+
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')  # registered on attach before 3.13
+
+    _attached[name] = shm
+    return shm
+
+
+def is_backed(neo_obj, ref):
+    """ True if the data of an object are the shared memory block of ref """
+    name, shape, dtype = ref
+    buf = get_memory(name).buf
+
+    address = np.frombuffer(buf, np.uint8, count=1).__array_interface__['data'][0]
+    return neo_obj.__array_interface__['data'][0] == address and neo_obj.shape == shape
+
+
+def shared_class(neo_class):
+    """ Subclass of a Neo data class with the same name, pickled by reference """
+    try:
+        return _classes[neo_class]
+    except KeyError:
+        pass
+
+    def __reduce__(self):
+        state = dict([(k, v) for k, v in self.__dict__.items() if not k == '_shared_ref'])
+        ref = self.__dict__.get('_shared_ref')
+
+        if ref is None or not is_backed(self, ref):  # a result of slicing, arithmetic etc.
+            plain = self.view(neo_class)
+            plain.__dict__.update(state)
+            return plain.__reduce__()
+
+        return attach, (neo_class, ref, state)
+
+    _classes[neo_class] = type(neo_class.__name__, (neo_class,), {'__reduce__': __reduce__})
+    return _classes[neo_class]
+
+
+def attach(neo_class, ref, state):
+    """ Neo object of the data in a shared memory block, see share """
+    name, shape, dtype = ref
+    data = np.ndarray(shape, dtype, buffer=get_memory(name).buf)
+
+    neo_obj = data.view(shared_class(neo_class))
+    neo_obj.__dict__.update(state)
+    neo_obj._shared_ref = ref
+
+    return neo_obj
+
+
+def share(neo_obj, manager):
+    """
+    Copies the data of a Neo data object (AnalogSignal, SpikeTrain etc.) to
+    a new shared memory block of manager.
+
+    :return:    equal object using the shared memory block
+    """
+    data = np.asarray(neo_obj)
+
+    shm = manager.SharedMemory(max(data.nbytes, 1))
+    _attached[shm.name] = shm
+
+    np.ndarray(data.shape, data.dtype, buffer=shm.buf)[...] = data
+
+    return attach(type(neo_obj), (shm.name, data.shape, data.dtype.str), dict(neo_obj.__dict__))
+
+
+def release():
+    """
+    Unmaps all shared memory blocks mapped by this process. Objects using
+    them must not be used any more.
+    """
+    for name, shm in list(_attached.items()):
+        try:
+            shm.close()
+        except BufferError:
+            continue  # still used by an object
+
+        del _attached[name]
@@ -0,0 +1,99 @@
+"""
+Summary statistics of a Block computed from the stored data arrays, without
+creating Neo objects.
+
+Every Segment is reduced to partial results by a worker process (see
+Reader.read_segment_stats), which are then combined:
+
+    tables = NixIO('/data/session.h5').read_statistics('session', processes=8)
+    for row in tables['units']:
+        print(row['unit'], row['rate'])
+"""
+from multiprocessing import Pool
+
+import numpy as np
+
+from neo2nix.nixio import NixIO
+
+
+def segment_stats(args):
+    """ Partial statistics of a single Segment. Runs in a worker process. """
+    filename, block_id, seg_id = args
+    return NixIO(filename, readonly=True).read_segment_stats(block_id, seg_id)
+
+
+def merge_units(a, b):
+    """ Combines spike counts and durations of Units (see read_segment_stats) """
+    result = dict([(k, dict(v)) for k, v in a.items()])
+
+    for label, counts in b.items():
+        total = result.setdefault(label, {'count': 0, 'duration': 0.})
+        total['count'] += counts['count']
+        total['duration'] += counts['duration']
+
+    return result
+
+
+def compute(filename, block_id, segments=None, processes=None):
+    """
+    :param segments:    names of the Segments to include, by default all
+    :param processes:   number of worker processes, by default one per CPU
+    :return:            dict of tables (lists of row dicts):
+                        'signals' - per Segment, signal and channel: 'n',
+                                    'mean', 'var', 'rms' in signal units
+                        'units' - per Unit ('<RCG>/<Unit>') over all
+                                  Segments: 'spikes', 'duration' (s) and
+                                  'rate' (Hz)
+                        'events' - per Segment and label: 'count'
+    """
+    if segments is None:
+        segments = NixIO(filename, readonly=True).list_segments(block_id)
+
+    tasks = [(filename, block_id, x) for x in segments]
+    if len(tasks) < 2 or processes == 1:
+        partials = [segment_stats(x) for x in tasks]
+    else:
+        pool = Pool(processes)
+        try:
+            partials = pool.map(segment_stats, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    tables = {'signals': [], 'units': [], 'events': []}
+    units = {}
+
+    for seg_id, partial in zip(segments, partials):
+        for array_name, moments in sorted(partial['signals'].items()):
+            n = moments['n']
+            mean = np.atleast_1d(moments['mean'])
+            var = np.atleast_1d(moments['m2']) / n
+
+            for channel in range(len(mean)):
+                tables['signals'].append({
+                    'segment': seg_id,
+                    'signal': moments['name'],
+                    'array': array_name,
+                    'channel': channel,
+                    'units': moments['units'],
+                    'n': n,
+                    'mean': float(mean[channel]),
+                    'var': float(var[channel]),
+                    'rms': float(np.sqrt(var[channel] + mean[channel] ** 2)),
+                })
+
+        for label, count in sorted(partial['events'].items()):
+            tables['events'].append({'segment': seg_id, 'label': label, 'count': count})
+
+        units = merge_units(units, partial['units'])
+
+    for label, counts in sorted(units.items()):
+        duration = counts['duration']
+        tables['units'].append({
+            'unit': label,
+            'spikes': counts['count'],
+            'duration': duration,
+            'rate': counts['count'] / duration if duration else float('nan'),
+        })
+
+    return tables
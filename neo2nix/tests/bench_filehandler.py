@@ -0,0 +1,86 @@
+"""
+Benchmark of FileHandler tunables: writing many Segments with and without a
+session (one flush at the end instead of one per call) and strided reads of
+a 2-D signal with different read_window sizes.
+
+    python -m neo2nix.tests.bench_filehandler [samples] [channels] [segments]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import quantities as pq
+from neo import Block, Segment, AnalogSignal
+
+from neo2nix.nixio import NixIO
+
+
+filename = '/tmp/bench_filehandler.h5'
+
+
+def timed(label, func):
+    start = time.time()
+    func()
+    print('%-40s %8.3f s' % (label, time.time() - start))
+
+
+def build_segment(index, samples, channels):
+    segment = Segment(name='seg%d' % index)
+    data = np.random.randn(samples, channels)
+    segment.analogsignals.append(AnalogSignal(data, units='mV', sampling_rate=1 * pq.kHz))
+    return segment
+
+
+def bench_writes(segments, samples, channels):
+    def write(session):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+        io = NixIO(filename)
+        io.write_block(Block(name='bench'), recursive=False)
+
+        def append_all():
+            for i in range(segments):
+                io.append_segment('bench', build_segment(i, samples // segments, channels))
+
+        if session:
+            with io.session():
+                append_all()
+        else:
+            append_all()
+
+    timed('append %d segments, no session' % segments, lambda: write(False))
+    timed('append %d segments, session' % segments, lambda: write(True))
+
+
+def bench_reads(samples, channels):
+    if os.path.exists(filename):
+        os.remove(filename)
+
+    block = Block(name='bench')
+    block.segments.append(build_segment(0, samples, channels))
+    NixIO(filename).write_block(block)
+
+    for read_window in (None, 2 ** 16, 2 ** 20, 2 ** 24):
+        io = NixIO(filename, read_window=read_window)
+
+        def read():
+            with io.session():
+                for max_points in (samples // 10, samples // 100):
+                    segment = io.read_block('bench', max_points=max_points).segments[0]
+                    len(segment.analogsignals[0])
+
+        timed('strided reads, read_window=%s' % read_window, read)
+
+
+if __name__ == '__main__':
+    args = [int(x) for x in sys.argv[1:4]]
+    samples, channels, segments = args + [10 ** 6, 16, 100][len(args):]
+
+    try:
+        bench_writes(segments, samples, channels)
+        bench_reads(samples, channels)
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
@@ -0,0 +1,30 @@
+"""
+Benchmark of the time to import neo2nix.nixio in a fresh interpreter, which
+should not load Neo, NIX or numpy (see test_import).
+
+    python -m neo2nix.tests.bench_import [runs]
+"""
+import os
+import subprocess
+import sys
+
+
+code = ';'.join([
+    "import time",
+    "started = time.time()",
+    "import neo2nix.nixio",
+    "print(time.time() - started)",
+])
+
+
+def measure():
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root)
+    return float(subprocess.check_output([sys.executable, '-c', code], env=env))
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    times = sorted([measure() for i in range(runs)])
+
+    print('import neo2nix.nixio: min %.4f s, median %.4f s' % (times[0], times[len(times) // 2]))
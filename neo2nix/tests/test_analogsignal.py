@@ -1,8 +1,21 @@
 import unittest
+import pickle
 import os
+from multiprocessing import Pool
+from multiprocessing.managers import SharedMemoryManager
+
+import numpy as np
+import quantities as pq
 
 from .utils import build_fake_block
-from neo2nix.nixio import NixIO, simple_attrs
+from neo2nix import sharedmem
+from neo2nix.nixio import NixIO, Writer, simple_attrs
+
+
+def fill_shared(sig):
+    """ Writes to a signal in a worker process, see test_shared_memory_pool """
+    sig.magnitude[...] = 7
+    return sharedmem.is_backed(sig, sig._shared_ref)
 
 
 class TestBlock(unittest.TestCase):
@@ -65,4 +78,246 @@ class TestBlock(unittest.TestCase):
         b2 = self.io.read_block(self.neob.name)
         s2 = b2.segments[0]
         sig = s2.analogsignals[0]
-        assert sig.description == description
\ No newline at end of file
+        assert sig.description == description
+
+    def test_summary(self):
+        chunk = 10
+        self.io.write_block(self.neob, summary_chunk=chunk)
+
+        summaries = self.io.read_summaries(self.neob.name, self.neos.name)
+        assert len(summaries) == len(self.neos.analogsignals)
+
+        summary = [x for x in summaries.values() if x['name'] == self.neosig.name][0]
+        data = self.neosig.magnitude
+
+        assert len(summary['min']) == len(range(0, len(data), chunk))
+        assert summary['min'][0].item() == data[:chunk].min()
+        assert abs(summary['mean'][0].item() - data[:chunk].mean()) < 1e-9
+        assert summary['chunk_duration'] == chunk * self.neosig.sampling_period
+
+    def test_pyramid(self):
+        self.io.write_block(self.neob, pyramid=(2, 4))
+
+        b1 = self.io.read_block(self.neob.name, max_points=len(self.neosig) // 2 + 2)
+        seg = [s_i for s_i in b1.segments if s_i.name == self.neos.name][0]
+        sig = [a_i for a_i in seg.analogsignals if a_i.name == self.neosig.name][0]
+
+        assert sig.annotations['decimation'] == 4
+        assert sig.sampling_rate == self.neosig.sampling_rate / 2
+        assert sig.magnitude[0] == self.neosig.magnitude[:4].min()
+        assert sig.magnitude[1] == self.neosig.magnitude[:4].max()
+
+    def test_downsample(self):
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        data = self.neosig.magnitude
+
+        sig = self.io.read_analogsignal(self.neob.name, array_id, step=3)
+        assert len(sig) == len(data[::3])
+        assert (sig.magnitude == data[::3]).all()
+        assert sig.sampling_rate == self.neosig.sampling_rate / 3
+
+        sig = self.io.read_analogsignal(self.neob.name, array_id, downsample=2)
+        assert len(sig) == len(data) // 2
+        assert abs(sig.magnitude[0] - data[:2].mean()) < 1e-9
+        assert sig.sampling_rate == self.neosig.sampling_rate / 2
+
+    def test_write_downsampled(self):
+        b1 = self.io.read_block(self.neob.name, step=2)
+        s1 = [s_i for s_i in b1.segments if s_i.name == self.neos.name][0]
+        sig = [a_i for a_i in s1.analogsignals if a_i.name == self.neosig.name][0]
+
+        self.io.write_block(b1)  # unchanged, the full signal is kept
+
+        sig.description = 'changed'
+        self.assertRaises(ValueError, self.io.write_block, b1)
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        sig = self.io.read_analogsignal(self.neob.name, array_id)
+        assert (sig.magnitude == self.neosig.magnitude).all()
+
+    def test_storage_dtype(self):
+        os.remove(self.filename)
+        self.io.write_block(self.neob, storage_dtype='int16')
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        sig = self.io.read_analogsignal(self.neob.name, array_id)
+        data = self.neosig.magnitude
+
+        gain = (data.max() - data.min()) / 65535.
+        assert sig.dtype.kind == 'f'
+        assert abs(sig.magnitude - data).max() <= gain
+
+    def test_iter_chunks(self):
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        data = self.neosig.magnitude
+        period = self.neosig.sampling_period
+
+        chunks = list(self.io.iter_analogsignal_chunks(self.neob.name, array_id, 10 * period, 2 * period))
+
+        assert len(chunks[0]) == 10
+        assert (chunks[0].magnitude == data[:10]).all()
+        assert (chunks[1].magnitude[:2] == data[8:10]).all()
+        assert abs((chunks[1].t_start - (self.neosig.t_start + 8 * period)).magnitude) < 1e-9
+        assert chunks[-1].magnitude[-1] == data[-1]
+
+    def test_repack(self):
+        for i in range(3):
+            self.neosig += 1 * self.neosig.units  # new content, new data array
+            self.io.write_block(self.neob)
+
+        size = os.path.getsize(self.filename)
+        self.io.repack()
+        assert os.path.getsize(self.filename) < size
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        sig = self.io.read_analogsignal(self.neob.name, array_id)
+        assert (sig.magnitude == self.neosig.magnitude).all()
+        assert sig.name == self.neosig.name
+        assert len(self.io.read_block(self.neob.name).segments) == len(self.neob.segments)
+
+    def test_repack_same_names(self):
+        rcg2 = self.neob.recordingchannelgroups[1]
+        rcg2.units[0].name = 'unit1'  # Unit names are unique per RCG only
+        self.io.write_block(self.neob)
+
+        self.io.repack()
+
+        b1 = self.io.read_block(self.neob.name)
+        for rcg in self.neob.recordingchannelgroups:
+            rcg1 = [x for x in b1.recordingchannelgroups if x.name == rcg.name][0]
+            for unit in rcg.units:
+                unit1 = [x for x in rcg1.units if x.name == unit.name][0]
+                assert len(unit1.spiketrains) == len(unit.spiketrains)
+
+        self.assertRaises(IOError, NixIO(self.filename, readonly=True).repack)
+
+    def test_repack_storage_dtype(self):
+        os.remove(self.filename)
+        self.io.write_block(self.neob, storage_dtype='int16')
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        before = self.io.read_analogsignal(self.neob.name, array_id)
+
+        self.io.repack()
+
+        after = self.io.read_analogsignal(self.neob.name, array_id)
+        assert (after.magnitude == before.magnitude).all()
+
+        self.io.f.open()
+        try:
+            assert self.io.f.handle.blocks[self.neob.name].data_arrays[array_id].dtype == 'int16'
+        finally:
+            self.io.f.close()
+
+    def test_shared(self):
+        def stored():
+            self.io.f.open()
+            try:
+                return [x.name for x in self.io.f.handle.blocks['neo2nix_store'].data_arrays]
+            finally:
+                self.io.f.close()
+
+        os.remove(self.filename)
+        self.io.write_block(self.neob, shared=True)
+        n_stored = len(stored())
+
+        name = self.neob.name
+        self.neob.name += 'copy'
+        self.io.write_block(self.neob, shared=True)
+        assert len(stored()) == n_stored  # both Blocks use the same data
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        for block_id in (name, self.neob.name):
+            sig = self.io.read_analogsignal(block_id, array_id)
+            assert (sig.magnitude == self.neosig.magnitude).all()
+
+        self.neosig += 1 * self.neosig.units  # the first Block still uses the old data
+        self.io.write_block(self.neob, shared=True)
+        assert len(stored()) == n_stored + 1
+
+        sig = self.io.read_analogsignal(name, array_id)
+        assert (sig.magnitude == self.neosig.magnitude - 1).all()
+
+    def test_shared_repack(self):
+        os.remove(self.filename)
+        self.io.write_block(self.neob, shared=True)
+
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+        self.io.f.open()
+        try:
+            nix_file = self.io.f.handle
+            n_stored = len(nix_file.blocks['neo2nix_store'].data_arrays)
+            del nix_file.blocks[self.neob.name].data_arrays[array_id]  # its stored data are unused now
+        finally:
+            self.io.f.close()
+
+        self.io.repack()
+
+        self.io.f.open()
+        try:
+            assert len(self.io.f.handle.blocks['neo2nix_store'].data_arrays) == n_stored - 1
+        finally:
+            self.io.f.close()
+
+    def test_times_array(self):
+        os.remove(self.filename)
+        self.io.write_block(self.neob, times_array=True)
+
+        irr = self.neos.irregularlysampledsignals[0]
+        array_id = Writer.Help.get_obj_nix_name(irr)
+
+        sig = self.io.read_object(self.neob.name, 'irregularlysampledsignal', array_id)
+        assert (sig.times == irr.times).all()
+        assert (sig.magnitude == irr.magnitude).all()
+
+        window = (irr.times[1], irr.times[-1] + 1 * pq.ms)
+        sig = self.io.read_object(self.neob.name, 'irregularlysampledsignal', array_id, time_window=window)
+        assert (sig.times == irr.times[1:]).all()
+        assert (sig.magnitude == irr.magnitude[1:]).all()
+
+    def test_write_time_window(self):
+        full = self.neos.irregularlysampledsignals[0]
+
+        b1 = self.io.read_block(self.neob.name, time_window=(full.times[1], None))
+        s1 = [s_i for s_i in b1.segments if s_i.name == self.neos.name][0]
+        for irr in s1.irregularlysampledsignals:
+            irr.description = 'changed'
+
+        self.assertRaises(ValueError, self.io.write_block, b1)
+
+        array_id = Writer.Help.get_obj_nix_name(full)
+        sig = self.io.read_object(self.neob.name, 'irregularlysampledsignal', array_id)
+        assert len(sig) == len(full)
+
+    def test_shared_memory(self):
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+
+        with SharedMemoryManager() as smm:
+            sig = self.io.read_analogsignal(self.neob.name, array_id, shared_memory=smm)
+            assert (sig.magnitude == self.neosig.magnitude).all()
+
+            assert sig.__reduce__()[0] is sharedmem.attach  # pickled by reference
+
+            copy = pickle.loads(pickle.dumps(sig))
+            assert np.shares_memory(copy.magnitude, sig.magnitude)
+            assert copy.sampling_rate == sig.sampling_rate
+            assert copy.units == sig.units
+
+            part = pickle.loads(pickle.dumps(sig[:10]))  # not in shared memory any more
+            assert (part.magnitude == self.neosig.magnitude[:10]).all()
+
+    def test_shared_memory_pool(self):
+        array_id = Writer.Help.get_obj_nix_name(self.neosig)
+
+        with SharedMemoryManager() as smm:
+            sig = self.io.read_analogsignal(self.neob.name, array_id, shared_memory=smm)
+
+            pool = Pool(2)
+            try:
+                assert pool.map(fill_shared, [sig]) == [True]
+            finally:
+                pool.close()
+                pool.join()
+
+            # the worker wrote to the buffer of this process, which outlives it
+            assert (sig.magnitude == 7).all()
@@ -0,0 +1,48 @@
+import unittest
+import asyncio
+import os
+
+from .utils import build_fake_block
+from neo2nix.nixio import NixIO
+
+
+class TestAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "/tmp/unittest.h5"
+        self.neob = build_fake_block()
+
+        self.io = NixIO(self.filename)
+
+    def tearDown(self):
+        self.io.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_write_read(self):
+        async def run():
+            await self.io.write_block_async(self.neob)
+
+            tasks = [self.io.read_block_async(self.neob.name) for i in range(4)]
+            blocks = await asyncio.gather(*tasks)
+
+            segments = [x async for x in self.io.iter_segments_async(self.neob.name)]
+            return blocks, segments
+
+        blocks, segments = asyncio.run(run())
+
+        assert all([b.name == self.neob.name for b in blocks])
+        assert all([s.analogsignals.is_loaded for b in blocks for s in b.segments])
+        assert len(segments) == len(self.neob.segments)
+        assert all([s.analogsignals.is_loaded for s in segments])
+
+    def test_append(self):
+        async def run():
+            await self.io.write_block_async(self.neob, recursive=False)
+            for i, seg in enumerate(build_fake_block().segments):
+                seg.name = 'trial%d' % i
+                await self.io.append_segment_async(self.neob.name, seg)
+
+        asyncio.run(run())
+
+        assert len(self.io.read_block(self.neob.name).segments) == len(self.neob.segments)
@@ -56,4 +56,32 @@ class TestBlock(unittest.TestCase):
         self.io.write_block(b1, recursive=False)
 
         b2 = self.io.read_block(self.neob.name)
-        assert b2.description == description
\ No newline at end of file
+        assert b2.description == description
+
+    def test_iter_blocks(self):
+        b1 = self.io.read_block(self.neob.name)
+        b1.name += 'foo'
+        b1.annotations['int'] = 43
+        self.io.write_block(b1)
+
+        names = [x.name for x in self.io.iter_blocks()]
+        assert sorted(names) == sorted([self.neob.name, b1.name])
+
+        names = [x.name for x in self.io.iter_blocks(names=[b1.name])]
+        assert names == [b1.name]
+
+        names = [x.name for x in self.io.iter_blocks(where={'int': 42})]
+        assert names == [self.neob.name]
+
+    def test_session(self):
+        with self.io.session():
+            b1 = self.io.read_block(self.neob.name)
+            b1.description = 'changed in a session'
+            self.io.write_block(b1, recursive=False)
+            self.io.flush()
+
+            assert self.io.f.is_open
+            assert self.io.read_block(self.neob.name).description == b1.description
+
+        assert not self.io.f.is_open
+        assert self.io.read_block(self.neob.name).description == b1.description
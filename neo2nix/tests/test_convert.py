@@ -0,0 +1,84 @@
+import unittest
+import shutil
+import os
+
+from neo.io import PickleIO
+
+from .utils import build_fake_block
+from neo2nix.convert import convert, main
+from neo2nix.nixio import NixIO
+
+
+class TestConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = "/tmp/unittest_convert"
+        os.makedirs(self.folder)
+
+        self.neob = build_fake_block()
+        self.sources = [os.path.join(self.folder, 'rec%d.pkl' % i) for i in range(3)]
+        for path in self.sources:
+            PickleIO(filename=path).write_block(self.neob)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_convert(self):
+        out_dir = os.path.join(self.folder, 'nix')
+        reports = []
+
+        results = convert(self.sources, out_dir, processes=2, report=lambda *args: reports.append(args))
+
+        assert len(results) == len(self.sources)
+        assert all([x[4] is None for x in results])
+        assert len(reports) == len(self.sources)
+
+        b1 = NixIO(os.path.join(out_dir, 'rec0.h5')).read_block(self.neob.name)
+        assert len(b1.segments) == len(self.neob.segments)
+
+        # converted files are skipped
+        assert len(convert(self.sources, out_dir, processes=2, report=None)) == 0
+
+    def test_same_names(self):
+        sources = []
+        for folder in ('a', 'b'):
+            os.makedirs(os.path.join(self.folder, folder))
+            sources.append(os.path.join(self.folder, folder, 'rec.pkl'))
+            PickleIO(filename=sources[-1]).write_block(self.neob)
+
+        out_dir = os.path.join(self.folder, 'nix')
+        results = convert(sources, out_dir, processes=2, report=None)
+
+        assert sorted([x[1] for x in results]) == [os.path.join(out_dir, x, 'rec.h5') for x in ('a', 'b')]
+        assert all([x[4] is None for x in results])
+
+        clash = os.path.join(self.folder, 'a', 'rec.pickle')
+        self.assertRaises(ValueError, convert, sources + [clash], out_dir, report=None)
+
+    def test_root(self):
+        sources = []
+        for folder in ('a', 'b'):
+            os.makedirs(os.path.join(self.folder, folder))
+            sources.append(os.path.join(self.folder, folder, 'rec.pkl'))
+            PickleIO(filename=sources[-1]).write_block(self.neob)
+
+        out_dir = os.path.join(self.folder, 'nix')
+        results = convert(sources[:1], out_dir, processes=2, report=None, root=self.folder)
+        assert [x[1] for x in results] == [os.path.join(out_dir, 'a', 'rec.h5')]
+
+        # paths do not depend on the selection of sources, a is not converted again
+        results = convert(sources, out_dir, processes=2, report=None, root=self.folder)
+        assert [x[1] for x in results] == [os.path.join(out_dir, 'b', 'rec.h5')]
+
+        self.assertRaises(ValueError, convert, sources, out_dir, report=None, root=os.path.join(self.folder, 'a'))
+
+    def test_main(self):
+        out_dir = os.path.join(self.folder, 'nix')
+        args = ['-o', out_dir, '-j', '2', '--root', self.folder, '--compact', '--shared', '--times-array']
+
+        assert main(args + self.sources) == 0
+        b1 = NixIO(os.path.join(out_dir, 'rec0.h5')).read_block(self.neob.name)
+        assert len(b1.segments) == len(self.neob.segments)
+
+        missing = os.path.join(self.folder, 'missing.pkl')
+        assert main(args + [missing]) == 1  # reported as failed, not raised
@@ -0,0 +1,41 @@
+import unittest
+import os
+
+from .utils import build_fake_block
+from neo2nix.nixio import NixIO
+from neo2nix.dataset import Dataset
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.filenames = ["/tmp/unittest.h5", "/tmp/unittest2.h5"]
+        self.neob = build_fake_block()
+
+        for filename in self.filenames:
+            NixIO(filename).write_block(self.neob)
+
+    def tearDown(self):
+        for filename in self.filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_catalog(self):
+        ds = Dataset('/tmp/unittest*.h5', processes=2)
+
+        assert ds.files == self.filenames
+        assert len(ds.find(type='block')) == 2
+        assert len(ds.find(type='block', files=self.filenames[:1])) == 1
+
+    def test_load(self):
+        ds = Dataset(self.filenames, processes=2)
+        neos = self.neob.segments[0]
+
+        entries = ds.find(type='segment', where={'name': neos.name})
+        segments = ds.load(entries)
+
+        assert [x['file'] for x in entries] == self.filenames
+        for segment in segments:
+            assert segment.name == neos.name
+            assert len(segment.analogsignals) == len(neos.analogsignals)
+            assert len(segment.spiketrains) == len(neos.spiketrains)
@@ -0,0 +1,26 @@
+import unittest
+import subprocess
+import sys
+import os
+
+
+class TestImport(unittest.TestCase):
+    """
+    neo2nix.nixio should load its heavy dependencies only when they are
+    first used. Import time is measured by bench_import.
+    """
+
+    heavy = ('neo', 'nix', 'quantities', 'numpy', 'asyncio')
+
+    def test_lazy_imports(self):
+        code = ';'.join([
+            "import sys",
+            "import neo2nix.nixio",
+            "print(','.join([x for x in %r if x in sys.modules]))" % (self.heavy,),
+        ])
+
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=root)
+        loaded = subprocess.check_output([sys.executable, '-c', code], env=env).decode('UTF-8').strip()
+
+        assert not loaded, "imported eagerly: %s" % loaded
@@ -0,0 +1,50 @@
+import unittest
+import os
+
+from .utils import build_fake_block
+from neo2nix.nixio import NixIO
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "/tmp/unittest.h5"
+        self.neob = build_fake_block()
+
+        for i, st in enumerate(self.neob.segments[0].spiketrains):
+            st.annotations['cell_type'] = 'PV' if i % 2 else 'SST'
+        self.neob.segments[1].annotations['trial_outcome'] = 'hit'
+
+        self.io = NixIO(self.filename)
+        self.io.write_block(self.neob)
+
+    def tearDown(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_find(self):
+        pv = [x for x in self.neob.segments[0].spiketrains if x.annotations['cell_type'] == 'PV']
+
+        found = self.io.find(type='spiketrain', where={'cell_type': 'PV'})
+        assert len(found) == len(pv)
+        assert all([x.annotations['cell_type'] == 'PV' for x in found])
+
+        st = found[0].load()
+        assert st.annotations['cell_type'] == 'PV'
+
+        found = self.io.find(type='segment', where={'trial_outcome': lambda x: x in ('hit', 'miss')})
+        assert [x.name for x in found] == [self.neob.segments[1].name]
+        assert len(found[0].load().spiketrains) == len(self.neob.segments[1].spiketrains)
+
+    def test_saved_index(self):
+        entries = self.io.build_index(save=True)
+
+        io = NixIO(self.filename)
+        assert io.build_index() == entries
+
+        b1 = io.read_block(self.neob.name)
+        b1.segments[0].annotations['trial_outcome'] = 'miss'
+        io.write_block(b1)
+
+        found = NixIO(self.filename).find(type='segment', where={'trial_outcome': 'miss'})
+        assert len(found) == 1
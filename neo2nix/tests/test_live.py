@@ -0,0 +1,139 @@
+import unittest
+import multiprocessing
+import time
+import os
+
+import numpy as np
+import quantities as pq
+from neo import Block, Segment, AnalogSignal, SpikeTrain
+
+from neo2nix.nixio import NixIO, Writer, live_array_name
+from neo2nix.live import LiveWriter, LiveReader
+
+
+chunk_len = 100
+n_chunks = 20
+
+
+def write(filename, block_id, sig_id, st_id):
+    with LiveWriter(filename, flush_interval=0.05) as writer:
+        for i in range(1, n_chunks):
+            writer.append(block_id, sig_id, np.arange(i * chunk_len, (i + 1) * chunk_len, dtype=float))
+            writer.append(block_id, st_id, [i + 0.5] * pq.s)
+            time.sleep(0.01)
+
+
+def read(filename, block_id, sig_id, st_id, results):
+    reader = LiveReader(filename)
+    samples, spikes = [], []
+
+    deadline = time.time() + 60
+    while time.time() < deadline and len(spikes) < n_chunks:
+        samples.append(reader.read_tail(block_id, sig_id).magnitude.ravel())
+        spikes += list(reader.read_tail(block_id, st_id).magnitude)
+        time.sleep(0.01)  # let the writer open the file
+    samples.append(reader.read_tail(block_id, sig_id).magnitude.ravel())  # written with the last spike
+
+    samples = np.concatenate(samples)
+    results.put((len(samples), bool((samples == np.arange(len(samples))).all()), len(spikes)))
+
+
+class TestLive(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "/tmp/unittest.h5"
+
+        signal = AnalogSignal(np.arange(chunk_len, dtype=float), units='mV', sampling_rate=1 * pq.kHz)
+        spiketrain = SpikeTrain([0.5], units='s', t_stop=1 * pq.s)
+
+        segment = Segment(name='live')
+        segment.analogsignals.append(signal)
+        segment.spiketrains.append(spiketrain)
+
+        self.block = Block(name='recording')
+        self.block.segments.append(segment)
+
+        self.io = NixIO(self.filename)
+        self.io.write_block(self.block)
+
+        self.sig_id = Writer.Help.get_obj_nix_name(signal)
+        self.st_id = Writer.Help.get_obj_nix_name(spiketrain)
+
+    def tearDown(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_write_read(self):
+        args = (self.filename, self.block.name, self.sig_id, self.st_id)
+        results = multiprocessing.Queue()
+
+        readers = [multiprocessing.Process(target=read, args=args + (results,)) for i in range(2)]
+        writer = multiprocessing.Process(target=write, args=args)
+
+        for process in readers + [writer]:
+            process.start()
+
+        outcomes = [results.get(timeout=120) for x in readers]
+        for process in readers + [writer]:
+            process.join()
+
+        assert writer.exitcode == 0
+        for n_samples, in_order, n_spikes in outcomes:
+            assert n_samples == chunk_len * n_chunks
+            assert in_order
+            assert n_spikes == n_chunks
+
+        st = self.io.read_object(self.block.name, 'spiketrain', live_array_name(self.st_id))
+        assert len(st) == n_chunks
+        assert st.t_stop >= st.max()
+
+    def test_same_content(self):
+        with LiveWriter(self.filename, flush_interval=0) as writer:
+            writer.append(self.block.name, self.sig_id, np.arange(chunk_len, 2 * chunk_len, dtype=float))
+
+        # a new signal equal to the first samples must not resolve to the grown array
+        segment = Segment(name='new')
+        segment.analogsignals.append(self.block.segments[0].analogsignals[0].copy())
+        self.io.append_segment(self.block.name, segment)
+
+        sig = self.io.read_object(self.block.name, 'analogsignal', self.sig_id)
+        assert len(sig) == chunk_len
+
+        live = self.io.read_object(self.block.name, 'analogsignal', live_array_name(self.sig_id))
+        assert len(live) == 2 * chunk_len
+
+    def test_write_after_append(self):
+        with LiveWriter(self.filename, flush_interval=0) as writer:
+            writer.append(self.block.name, self.sig_id, np.arange(chunk_len, 2 * chunk_len, dtype=float))
+
+        self.block.segments[0].description = 'changed'
+        self.io.write_block(self.block)  # the Segment still refers to the grown array
+
+        segment = self.io.read_block(self.block.name).segments[0]
+        assert segment.description == 'changed'
+        assert len(segment.analogsignals) == 1
+        assert len(segment.analogsignals[0]) == 2 * chunk_len
+
+        self.block.segments[0].analogsignals[0].description = 'changed'
+        self.assertRaises(ValueError, self.io.write_block, self.block)
+
+    def test_flush_error(self):
+        writer = LiveWriter(self.filename, flush_interval=3600)
+        writer.append(self.block.name, 'missing', np.arange(chunk_len, dtype=float))
+        writer.append(self.block.name, self.sig_id, np.arange(chunk_len, 2 * chunk_len, dtype=float))
+
+        self.assertRaises(ValueError, writer.flush)
+        writer.flush()  # the bad entry was dropped
+
+        live = self.io.read_object(self.block.name, 'analogsignal', live_array_name(self.sig_id))
+        assert len(live) == 2 * chunk_len
+
+    def test_read_last(self):
+        with LiveWriter(self.filename, flush_interval=0) as writer:
+            writer.append(self.block.name, self.sig_id, np.arange(chunk_len, 2 * chunk_len, dtype=float))
+
+        sig = LiveReader(self.filename).read_last(self.block.name, self.sig_id, 10 * pq.ms)
+
+        assert len(sig) == 10
+        assert sig.magnitude.ravel()[-1] == 2 * chunk_len - 1
+        assert abs(float(sig.t_start.rescale(pq.ms)) - (2 * chunk_len - 10)) < 1e-9
@@ -0,0 +1,42 @@
+import unittest
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import build_fake_block
+from neo2nix.nixio import NixIO, ProxyList, Reader
+
+
+class TestProxyList(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "/tmp/unittest.h5"
+        self.neob = build_fake_block()
+
+        self.io = NixIO(self.filename)
+        self.io.write_block(self.neob)
+
+    def tearDown(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_threads(self):
+        fetched = []
+        block_id = self.neob.name
+
+        def fetch_segments(nix_file):
+            fetched.append(nix_file)
+            tags = [x for x in nix_file.blocks[block_id].tags if x.type == 'segment']
+            return [Reader.read_segment(self.io.f, block_id, x.name) for x in tags]
+
+        lists = [ProxyList(self.io.f, fetch_segments) for i in range(4)]
+
+        def traverse(i):
+            segments = lists[i % len(lists)]
+            return [len(x.analogsignals) for x in segments]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(traverse, range(32)))
+
+        assert len(fetched) == len(lists)  # every list is loaded once
+        expected = [len(x.analogsignals) for x in lists[0]]
+        assert all([x == expected for x in results])
@@ -1,8 +1,11 @@
 import unittest
 import os
+from collections import Counter
+
+import numpy as np
 
 from .utils import build_fake_block
-from neo2nix.nixio import NixIO, simple_attrs
+from neo2nix.nixio import NixIO, Writer, simple_attrs
 
 
 class TestSegment(unittest.TestCase):
@@ -62,4 +65,163 @@ class TestSegment(unittest.TestCase):
 
         b2 = self.io.read_block(self.neob.name)
         s2 = b2.segments[0]
-        assert s2.description == description
\ No newline at end of file
+        assert s2.description == description
+
+    def test_append_segment(self):
+        b0 = build_fake_block()
+        new_seg = b0.segments[0]
+        new_seg.name = 'appended'
+
+        self.io.append_segment(self.neob.name, new_seg)
+
+        b1 = self.io.read_block(self.neob.name)
+        assert len(b1.segments) == len(self.neob.segments) + 1
+
+        s1 = [x for x in b1.segments if x.name == new_seg.name][0]
+        assert len(s1.analogsignals) == len(new_seg.analogsignals)
+        assert len(s1.spiketrains) == len(new_seg.spiketrains)
+
+        self.assertRaises(ValueError, self.io.append_segment, self.neob.name, new_seg)
+
+    def test_skip_clean(self):
+        b1 = self.io.read_block(self.neob.name)
+        self.io.write_block(b1)
+
+        assert not b1.segments.is_loaded
+        assert not b1.recordingchannelgroups.is_loaded
+
+        s1 = b1.segments[0]
+        s1.description = 'changed'
+        self.io.write_block(b1)
+
+        assert not s1.analogsignals.is_loaded
+
+        b2 = self.io.read_block(self.neob.name)
+        s2 = [x for x in b2.segments if x.name == s1.name][0]
+        assert s2.description == 'changed'
+        assert len(s2.analogsignals) == len(s1.analogsignals)
+
+    def test_write_other_file(self):
+        other = NixIO("/tmp/unittest_other.h5")
+        try:
+            b1 = self.io.read_block(self.neob.name)
+            other.write_block(b1)
+
+            b2 = other.read_block(self.neob.name)
+            s2 = [x for x in b2.segments if x.name == self.neos.name][0]
+            assert len(b2.segments) == len(self.neob.segments)
+            assert len(b2.recordingchannelgroups) == len(self.neob.recordingchannelgroups)
+            assert len(s2.analogsignals) == len(self.neos.analogsignals)
+        finally:
+            if os.path.exists(other.filename):
+                os.remove(other.filename)
+
+    def test_rename_block(self):
+        b1 = self.io.read_block(self.neob.name)
+        b1.name += 'foo'
+        self.io.write_block(b1)
+
+        b2 = self.io.read_block(b1.name)
+        s2 = [x for x in b2.segments if x.name == self.neos.name][0]
+        assert len(b2.segments) == len(self.neob.segments)
+        assert len(s2.spiketrains) == len(self.neos.spiketrains)
+
+    def test_write_twice(self):
+        assert Writer.Help.is_clean(self.neob)  # written in setUp
+
+        b1 = self.io.read_block(self.neob.name)
+        s1 = b1.segments[0]
+        s1.analogsignals[0].description = 'changed'
+        assert not Writer.Help.is_clean(b1)
+
+        self.io.write_block(b1)
+        assert Writer.Help.is_clean(b1)  # the next write does nothing
+
+    def test_change_data_attrs(self):
+        b1 = self.io.read_block(self.neob.name)
+        s1 = [x for x in b1.segments if x.name == self.neos.name][0]
+
+        sig = s1.analogsignals[0]
+        sig.t_start = sig.t_start + 1 * sig.t_start.units
+        event = s1.events[0]
+        event.labels = np.array([b'changed'] * len(event), dtype='S')
+
+        self.io.write_block(b1)
+
+        b2 = self.io.read_block(self.neob.name)
+        s2 = [x for x in b2.segments if x.name == self.neos.name][0]
+
+        sig2 = [x for x in s2.analogsignals if x.name == sig.name][0]
+        assert sig2.t_start == sig.t_start
+
+        event2 = [x for x in s2.events if (x.times == event.times).all()][0]
+        assert list(event2.labels) == list(event.labels)
+
+    def test_release(self):
+        b1 = self.io.read_block(self.neob.name)
+        s1 = b1.segments[0]
+        n_signals = len(s1.analogsignals)
+
+        self.io.release(b1)
+
+        assert not b1.segments.is_loaded
+        assert not s1.analogsignals.is_loaded
+        assert len(b1.segments) == len(self.neob.segments)
+        assert len(b1.segments[0].analogsignals) == n_signals
+
+        b1.segments.append(b1.segments[0])
+        self.assertRaises(ValueError, b1.segments.evict)
+
+    def test_release_changed(self):
+        b1 = self.io.read_block(self.neob.name)
+        len(b1.recordingchannelgroups)
+        s1 = b1.segments[0]
+        s1.analogsignals[0].description = 'changed'
+
+        self.assertRaises(ValueError, self.io.release, b1)
+
+        # nothing was released, the change can still be written
+        assert b1.segments.is_loaded and b1.recordingchannelgroups.is_loaded
+        assert s1.analogsignals.is_loaded
+        self.io.write_block(b1)
+
+        b2 = self.io.read_block(self.neob.name)
+        s2 = [x for x in b2.segments if x.name == s1.name][0]
+        assert 'changed' in [x.description for x in s2.analogsignals]
+
+    def test_release_written(self):
+        b1 = self.io.read_block(self.neob.name)
+        s1 = b1.segments[0]
+        s1.analogsignals[0].description = 'changed'
+        s1.analogsignals.pop()
+
+        self.io.write_block(b1)
+        self.io.release(b1)  # the changes are saved now
+
+        assert not b1.segments.is_loaded
+        assert not s1.analogsignals.is_loaded
+        assert 'changed' in [x.description for x in s1.analogsignals]
+        assert len(s1.analogsignals) == len(self.neos.analogsignals) - 1
+
+    def test_statistics(self):
+        tables = self.io.read_statistics(self.neob.name, processes=2)
+
+        sig = self.neos.analogsignals[0]
+        rows = [x for x in tables['signals'] if x['segment'] == self.neos.name and x['signal'] == sig.name]
+        data = np.asarray(sig.magnitude, dtype=np.float64).reshape((len(sig), -1))
+
+        assert len(rows) == data.shape[1]
+        for row in rows:
+            column = data[:, row['channel']]
+            assert row['n'] == len(column)
+            assert abs(row['mean'] - column.mean()) < 1e-9
+            assert abs(row['var'] - column.var()) < 1e-9
+            assert abs(row['rms'] - np.sqrt((column ** 2).mean())) < 1e-9
+
+        unit1 = [x for x in tables['units'] if x['unit'] == 'rcg1/unit1'][0]
+        assert unit1['spikes'] == sum([len(x) for x in self.neos.spiketrains])
+
+        decode = lambda x: x.decode('UTF-8') if isinstance(x, bytes) else str(x)
+        labels = Counter([decode(x) for ev in self.neos.events for x in ev.labels])
+        counts = dict([(x['label'], x['count']) for x in tables['events'] if x['segment'] == self.neos.name])
+        assert counts == dict(labels)
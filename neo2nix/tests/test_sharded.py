@@ -0,0 +1,105 @@
+import unittest
+import os
+
+from .utils import build_fake_block
+from neo2nix.sharded import ShardedNixIO
+
+
+class TestSharded(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "/tmp/unittest.json"
+        self.neob = build_fake_block()
+
+        self.io = ShardedNixIO(self.filename, shards=3)
+        self.io.write_block(self.neob)
+
+    def tearDown(self):
+        for path in [x.filename for x in self.io.shards] + [self.filename]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_read(self):
+        io = ShardedNixIO(self.filename, readonly=True)
+        b1 = io.read_block(self.neob.name)
+
+        assert b1.name == self.neob.name
+        assert sorted([x.name for x in b1.segments]) == sorted([x.name for x in self.neob.segments])
+        assert len(b1.recordingchannelgroups) == len(self.neob.recordingchannelgroups)
+
+        rcg = [x for x in b1.recordingchannelgroups if x.name == 'rcg1'][0]
+        assert len(rcg.analogsignals) == len(self.neob.recordingchannelgroups[0].analogsignals)
+
+        unit = [x for x in rcg.units if x.name == 'unit1'][0]
+        assert len(unit.spiketrains) == len(self.neob.segments[0].spiketrains)
+
+    def test_unsegmented(self):
+        sig = self.neob.segments[0].analogsignals[0].copy()
+        sig += 1 * sig.units  # new content, in no Segment
+        self.neob.recordingchannelgroups[0].analogsignals.append(sig)
+        self.io.write_block(self.neob)
+
+        b1 = ShardedNixIO(self.filename, readonly=True).read_block(self.neob.name)
+        rcg = [x for x in b1.recordingchannelgroups if x.name == 'rcg1'][0]
+
+        assert len(rcg.analogsignals) == len(self.neob.recordingchannelgroups[0].analogsignals)
+        assert any([(x.magnitude == sig.magnitude).all() for x in rcg.analogsignals])
+
+    def test_write_read_block(self):
+        b1 = ShardedNixIO(self.filename, readonly=True).read_block(self.neob.name)
+        other = ShardedNixIO("/tmp/unittest_other.json", shards=3)
+        try:
+            other.write_block(b1, compact=True)
+
+            b2 = other.read_block(self.neob.name)
+            assert len(b2.segments) == len(self.neob.segments)
+            rcg = [x for x in b2.recordingchannelgroups if x.name == 'rcg1'][0]
+            assert len(rcg.analogsignals) == len(self.neob.recordingchannelgroups[0].analogsignals)
+            unit = [x for x in rcg.units if x.name == 'unit1'][0]
+            assert len(unit.spiketrains) == len(self.neob.segments[0].spiketrains)
+        finally:
+            for path in [x.filename for x in other.shards] + [other.filename]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_shared(self):
+        for io in self.io.shards:
+            os.remove(io.filename)
+        self.io.write_block(self.neob, shared=True)
+
+        stored = 0
+        for io in self.io.shards:
+            io.f.open()
+            try:
+                stored += len(io.f.handle.blocks['neo2nix_store'].data_arrays)
+            finally:
+                io.f.close()
+        assert stored > 0
+
+        b1 = ShardedNixIO(self.filename, readonly=True).read_block(self.neob.name)
+        rcg = [x for x in b1.recordingchannelgroups if x.name == 'rcg1'][0]
+        sig = self.neob.recordingchannelgroups[0].analogsignals[0]
+        assert any([(x.magnitude == sig.magnitude).all() for x in rcg.analogsignals])
+
+    def test_empty(self):
+        self.neob.recordingchannelgroups[0].units[0].spiketrains = []
+        self.io.write_block(self.neob)
+
+        b1 = ShardedNixIO(self.filename, readonly=True).read_block(self.neob.name)
+        rcg = [x for x in b1.recordingchannelgroups if x.name == 'rcg1'][0]
+        unit = [x for x in rcg.units if x.name == 'unit1'][0]
+        assert len(unit.spiketrains) == 0
+
+    def test_append_segment(self):
+        seg = build_fake_block().segments[0]
+        seg.name = 'appended'
+
+        self.io.append_segment(self.neob.name, seg)
+
+        shard = self.io.shards[self.io.shard_of(seg.name)]
+        assert seg.name in shard.list_segments(self.neob.name)
+        assert len(self.io.read_block(self.neob.name).segments) == len(self.neob.segments) + 1
+
+    def test_manifest(self):
+        self.assertRaises(ValueError, ShardedNixIO, self.filename, 5)
+        assert len(ShardedNixIO(self.filename).shards) == 3
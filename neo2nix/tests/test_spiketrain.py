@@ -66,4 +66,25 @@ class TestBlock(unittest.TestCase):
         b2 = self.io.read_block(self.neob.name)
         s2 = b2.segments[0]
         sig = s2.spiketrains[0]
-        assert sig.description == description
\ No newline at end of file
+        assert sig.description == description
+
+    def test_compact(self):
+        os.remove(self.filename)
+        self.io.write_block(self.neob, compact=True)
+
+        b1 = self.io.read_block(self.neob.name)
+        assert b1.annotations == self.neob.annotations
+        assert b1.description == self.neob.description
+
+        seg = [s_i for s_i in b1.segments if s_i.name == self.neos.name][0]
+        st = [x for x in seg.spiketrains if x.name == self.neost.name][0]
+
+        assert st.t_start == self.neost.t_start
+        assert st.t_stop == self.neost.t_stop
+        assert (st.magnitude == self.neost.magnitude).all()
+
+        # metadata in the old layout is replaced by a record on a compact write
+        os.remove(self.filename)
+        self.io.write_block(self.neob)
+        self.io.write_block(self.io.read_block(self.neob.name), compact=True)
+        assert self.io.read_block(self.neob.name).description == self.neob.description
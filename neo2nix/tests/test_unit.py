@@ -1,6 +1,10 @@
 import unittest
 import os
 
+import numpy as np
+import quantities as pq
+from neo import Segment
+
 from .utils import build_fake_block
 from neo2nix.nixio import NixIO, simple_attrs
 
@@ -68,4 +72,38 @@ class TestUnit(unittest.TestCase):
         b2 = self.io.read_block(self.neob.name)
         rcg2 = b2.recordingchannelgroups[0]
         unit2 = rcg2.units[0]
-        assert unit2.description == description
\ No newline at end of file
+        assert unit2.description == description
+
+    def test_spike_counts(self):
+        bin_size = 10 * pq.ms
+        counts, labels, edges = self.io.read_spike_counts(self.neob.name, bin_size)
+        label = self.rcg.name + '/' + self.unit.name
+
+        assert counts.shape == (len(labels), len(edges) - 1)
+        assert label in labels
+
+        expected = 0
+        for st in self.unit.spiketrains:
+            times = st.times.rescale(pq.ms).magnitude
+            expected += np.histogram(times, edges.rescale(pq.ms).magnitude)[0]
+        assert (counts[labels.index(label)] == expected).all()
+
+    def test_spike_counts_same_names(self):
+        rcg2 = self.neob.recordingchannelgroups[1]
+        rcg2.units[0].name = self.unit.name  # Unit names are unique per RCG only
+        self.io.write_block(self.neob)
+
+        counts, labels, edges = self.io.read_spike_counts(self.neob.name, 10 * pq.ms)
+
+        assert counts[labels.index(self.rcg.name + '/' + self.unit.name)].sum() > 0
+        assert counts[labels.index(rcg2.name + '/' + self.unit.name)].sum() == 0  # has no spikes
+
+    def test_spike_counts_empty(self):
+        self.io.append_segment(self.neob.name, Segment(name='empty'))
+
+        counts, labels, edges = self.io.read_spike_counts(self.neob.name, 10 * pq.ms, segment_id='empty')
+        assert counts.shape == (len(labels), 0)
+        assert len(edges) == 0
+
+        args = (self.neob.name, 10 * pq.ms, 1 * pq.s, 0 * pq.s)
+        self.assertRaises(ValueError, self.io.read_spike_counts, *args)